@@ -0,0 +1,163 @@
+"""
+Simulated Gemini and Speech-to-Text backends for offline benchmarks.
+
+The fakes replace only the network-facing pieces (`llm_service.get_model`
+and the GCS upload / recognition calls of `speech_service`), so everything
+else in the pipeline runs exactly as it does in production.
+"""
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from typing import Iterator
+from unittest import mock
+
+from speech2text import cli, llm_scheduler, llm_service, speech_service
+
+WORDS = "el la de que y en un una los se por con para como pero más este esta todo muy".split()
+
+
+class SimulatedError(RuntimeError):
+    """A transient backend failure; like Google API errors, it carries an HTTP status in `code`."""
+    code = 503
+
+
+class CallCounter:
+    """Thread-safe counter of calls and failures made against a fake backend."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, failed: bool):
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.errors += 1
+
+
+class FakeBackend:
+    """
+    Latency, error rate and output size of a simulated service.
+
+    Each call sleeps for `latency` seconds plus up to `jitter` seconds, fails
+    with a retryable error with probability `error_rate`, and otherwise
+    returns `output_words` words.
+    """
+
+    def __init__(self, latency: float = 0.01, jitter: float = 0.0, error_rate: float = 0.0, output_words: int = 300, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.output_words = output_words
+        self.counter = CallCounter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        """Returns this call's delay and whether it fails."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+        return delay, failed
+
+    def text(self) -> str:
+        with self._lock:
+            return " ".join(self._random.choice(WORDS) for _ in range(self.output_words)) + "."
+
+    def call(self) -> str:
+        """Simulates one request, raising RuntimeError for failed calls."""
+        delay, failed = self._draw()
+        time.sleep(delay)
+        self.counter.record(failed)
+        if failed:
+            raise SimulatedError("Simulated backend error.")
+        return self.text()
+
+
+class FakeGenerativeModel:
+    """Stands in for `genai.GenerativeModel`."""
+
+    def __init__(self, backend: FakeBackend):
+        self.backend = backend
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        text = self.backend.call()
+        usage = SimpleNamespace(
+            prompt_token_count=len(prompt) // llm_scheduler.CHARS_PER_TOKEN,
+            candidates_token_count=len(text) // llm_scheduler.CHARS_PER_TOKEN,
+        )
+        if stream:
+            # Like the SDK's streamed responses: iterable in pieces, with the full text once consumed.
+            words = text.split(" ")
+            pieces = [" ".join(words[i:i + 20]) + " " for i in range(0, len(words), 20)]
+            return FakeStreamedResponse(pieces, text, usage)
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+class FakeStreamedResponse:
+    """Stands in for a streamed `GenerateContentResponse`."""
+
+    def __init__(self, pieces, text: str, usage):
+        self._pieces = pieces
+        self.text = text
+        self.usage_metadata = usage
+
+    def __iter__(self):
+        return (SimpleNamespace(text=piece) for piece in self._pieces)
+
+
+class FakeOperation:
+    """Stands in for a long-running recognition operation that finishes after the backend latency."""
+
+    def __init__(self, backend: FakeBackend, name: str):
+        self.backend = backend
+        self.operation = SimpleNamespace(name=name)
+        self._delay, self._failed = backend._draw()
+        self._ready_at = time.monotonic() + self._delay
+        self._result = None
+
+    def done(self) -> bool:
+        return time.monotonic() >= self._ready_at
+
+    def result(self, timeout=None):
+        if self._result is None:
+            time.sleep(max(0.0, self._ready_at - time.monotonic()))
+            self.backend.counter.record(self._failed)
+            if self._failed:
+                raise RuntimeError("Simulated recognition error.")
+            alternative = SimpleNamespace(transcript=self.backend.text())
+            self._result = SimpleNamespace(results=[SimpleNamespace(alternatives=[alternative])])
+        return self._result
+
+
+@contextmanager
+def fake_llm(backend: FakeBackend, retry_base_seconds: float = 0.01) -> Iterator[FakeBackend]:
+    """Routes every Gemini request made through `llm_service` to `backend`, with a short retry backoff."""
+    model = FakeGenerativeModel(backend)
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(llm_service, "get_model", return_value=model))
+        stack.enter_context(mock.patch.object(llm_scheduler, "RETRY_BASE_SECONDS", retry_base_seconds))
+        yield backend
+
+
+@contextmanager
+def fake_speech(upload: FakeBackend, recognition: FakeBackend) -> Iterator[None]:
+    """Routes GCS uploads and recognition jobs to the given backends."""
+    def upload_to_gcs(local_file_path: str, bucket_name: str, destination_blob_name: str):
+        try:
+            upload.call()
+        except RuntimeError:
+            return None
+        return f"gs://{bucket_name}/{destination_blob_name}"
+
+    def start_transcription_job(gcs_uri: str, config: dict):
+        return FakeOperation(recognition, f"operations/{gcs_uri}")
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(cli, "GCS_BUCKET_NAME", "benchmark-bucket"))
+        stack.enter_context(mock.patch.object(speech_service, "upload_to_gcs", side_effect=upload_to_gcs))
+        stack.enter_context(mock.patch.object(speech_service, "start_transcription_job", side_effect=start_transcription_job))
+        yield
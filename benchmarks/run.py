@@ -0,0 +1,168 @@
+"""
+Offline throughput benchmarks for `post-process` and `transcribe-dir`.
+
+Runs the real CLI commands against simulated backends (see `benchmarks.fakes`)
+for every combination of part count and concurrency, and prints one JSON
+object per scenario with wall time, calls per second and peak memory.
+
+    python -m benchmarks.run --parts 10 100 1000 --concurrency 1 8 32
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks.fakes import FakeBackend, fake_llm, fake_speech
+from speech2text import metrics
+from speech2text.cli import cli
+from speech2text.logger_setup import log
+
+WORDS_PER_PART = 700
+
+
+def _write_parts(job_dir: Path, parts: int):
+    """Creates `parts` transcription part files of about `WORDS_PER_PART` words each."""
+    job_dir.mkdir()
+    writer = FakeBackend(output_words=WORDS_PER_PART, seed=1)
+    for index in range(parts):
+        with open(job_dir / f"bench_part_{index:04d}.json", "w", encoding="utf-8") as f:
+            json.dump({"transcript": writer.text()}, f)
+
+
+def _write_audio(audio_dir: Path, parts: int):
+    """Creates `parts` placeholder audio files; the fake upload never reads them."""
+    audio_dir.mkdir()
+    for index in range(parts):
+        (audio_dir / f"bench_part_{index:04d}.wav").write_bytes(b"")
+
+
+def _measure(args: List[str], trace_memory: bool) -> dict:
+    """Runs a CLI command and returns its wall time, peak traced memory and per-stage totals and counters."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        # Progress bars would otherwise be mixed into the JSON lines on stdout.
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.main(args=args, standalone_mode=False)
+    finally:
+        wall = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+    summary = metrics.get_metrics().summary()
+    return {
+        "wall_seconds": round(wall, 4),
+        "peak_memory_mb": round(peak / 2 ** 20, 2) if peak is not None else None,
+        "stage_seconds": {name: stage["total_seconds"] for name, stage in summary["stages"].items()},
+        "counters": summary["counters"],
+    }
+
+
+def bench_post_process(parts: int, concurrency: int, llm: dict, extra_args: List[str], trace_memory: bool) -> dict:
+    """Benchmarks `post-process` on `parts` synthetic transcripts."""
+    backend = FakeBackend(**llm)
+    with tempfile.TemporaryDirectory() as tmp:
+        job_dir = Path(tmp) / "bench"
+        _write_parts(job_dir, parts)
+        output = Path(tmp) / "bench.md"
+        args = ["post-process", str(job_dir), "--output", str(output), "--concurrency", str(concurrency), "--no-cache", "--fresh"] + extra_args
+        with fake_llm(backend):
+            metrics = _measure(args, trace_memory)
+        output_bytes = output.stat().st_size if output.exists() else 0
+
+    calls = backend.counter.calls
+    return dict(
+        metrics,
+        command="post-process",
+        parts=parts,
+        concurrency=concurrency,
+        llm_calls=calls,
+        llm_errors=backend.counter.errors,
+        calls_per_second=round(calls / metrics["wall_seconds"], 2) if metrics["wall_seconds"] else None,
+        output_bytes=output_bytes,
+    )
+
+
+def bench_transcribe_dir(parts: int, concurrency: int, upload: dict, recognition: dict, poll_interval: float, trace_memory: bool) -> dict:
+    """Benchmarks `transcribe-dir` on `parts` files, with `concurrency` upload workers."""
+    upload_backend = FakeBackend(**upload)
+    recognition_backend = FakeBackend(**recognition)
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_dir = Path(tmp) / "audio"
+        _write_audio(audio_dir, parts)
+        args = [
+            "transcribe-dir", str(audio_dir),
+            "--output-dir", str(Path(tmp) / "jobs"),
+            "--upload-workers", str(concurrency),
+            "--poll-interval", str(poll_interval),
+        ]
+        with fake_speech(upload_backend, recognition_backend):
+            metrics = _measure(args, trace_memory)
+
+    calls = upload_backend.counter.calls + recognition_backend.counter.calls
+    return dict(
+        metrics,
+        command="transcribe-dir",
+        parts=parts,
+        concurrency=concurrency,
+        speech_calls=calls,
+        speech_errors=upload_backend.counter.errors + recognition_backend.counter.errors,
+        calls_per_second=round(calls / metrics["wall_seconds"], 2) if metrics["wall_seconds"] else None,
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark speech2text against simulated Speech and Gemini backends.")
+    parser.add_argument("--suite", choices=["post-process", "transcribe-dir", "all"], default="all")
+    parser.add_argument("--parts", type=int, nargs="+", default=[10, 100, 1000], help="Part counts to benchmark.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrency settings to benchmark.")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds per simulated LLM call.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds added to each call.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability that a simulated call fails.")
+    parser.add_argument("--output-words", type=int, default=300, help="Words returned by each simulated LLM call.")
+    parser.add_argument("--upload-latency", type=float, default=0.01, help="Seconds per simulated GCS upload.")
+    parser.add_argument("--recognition-latency", type=float, default=0.05, help="Seconds until a simulated recognition job finishes.")
+    parser.add_argument("--poll-interval", type=float, default=0.01)
+    parser.add_argument("--no-memory", action="store_true", help="Skip peak memory tracking, which slows down the run.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Also write the results as a JSON array to this file.")
+    parser.add_argument("post_process_args", nargs=argparse.REMAINDER, help="Extra arguments for post-process, after '--'.")
+    args = parser.parse_args(argv)
+    extra_args = [arg for arg in args.post_process_args if arg != "--"]
+
+    llm = dict(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, output_words=args.output_words, seed=args.seed)
+    upload = dict(latency=args.upload_latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+    recognition = dict(latency=args.recognition_latency, jitter=args.jitter, error_rate=args.error_rate, output_words=WORDS_PER_PART, seed=args.seed + 1)
+
+    # Keep the CLI's own logging from dominating the run and the output.
+    level = log.level
+    log.setLevel(logging.CRITICAL)
+    results = []
+    try:
+        for parts, concurrency in itertools.product(args.parts, args.concurrency):
+            if args.suite in ("post-process", "all"):
+                results.append(bench_post_process(parts, concurrency, llm, extra_args, not args.no_memory))
+                print(json.dumps(results[-1]), flush=True)
+            if args.suite in ("transcribe-dir", "all"):
+                results.append(bench_transcribe_dir(parts, concurrency, upload, recognition, args.poll_interval, not args.no_memory))
+                print(json.dumps(results[-1]), flush=True)
+    finally:
+        log.setLevel(level)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,40 @@
+import io
+import wave
+from typing import BinaryIO, Tuple, Union
+
+# Number of sample frames read from the WAV file and fed to the encoder at a time.
+BLOCK_FRAMES = 64 * 1024
+
+
+def encode_flac(wav_source: Union[str, BinaryIO]) -> Tuple[bytes, int]:
+    """
+    Losslessly encodes a 16-bit PCM WAV file (a path or a binary file object) to FLAC, in memory.
+
+    The WAV samples are read and encoded in blocks of `BLOCK_FRAMES`, so only
+    the compressed output is ever held in full. Returns the FLAC bytes and the
+    sample rate. Requires the optional `soundfile` package.
+    """
+    try:
+        import soundfile
+    except ImportError:
+        raise RuntimeError("FLAC encoding requires the 'soundfile' package (pip install soundfile).")
+
+    with wave.open(wav_source, "rb") as source:
+        if source.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM audio can be encoded as FLAC.")
+        sample_rate = source.getframerate()
+        buffer = io.BytesIO()
+        with soundfile.SoundFile(
+            buffer,
+            mode="w",
+            samplerate=sample_rate,
+            channels=source.getnchannels(),
+            format="FLAC",
+            subtype="PCM_16",
+        ) as encoder:
+            while True:
+                frames = source.readframes(BLOCK_FRAMES)
+                if not frames:
+                    break
+                encoder.buffer_write(frames, dtype="int16")
+    return buffer.getvalue(), sample_rate
@@ -0,0 +1,173 @@
+import mmap
+import struct
+import wave
+from pathlib import Path
+from typing import List, NamedTuple
+
+import numpy as np
+
+from speech2text.logger_setup import log
+
+# Analysis frame used to measure energy when looking for silences.
+FRAME_SECONDS = 0.01
+# Length of the moving window a cut point must be quiet over.
+SILENCE_SECONDS = 0.3
+# Bytes copied per write when extracting a part from the source file.
+COPY_BLOCK_BYTES = 4 * 1024 * 1024
+
+SAMPLE_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# SubFormat GUID of a WAVE_FORMAT_EXTENSIBLE file holding plain PCM samples.
+KSDATAFORMAT_SUBTYPE_PCM = b"\x01\x00\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+
+
+class WavInfo(NamedTuple):
+    channels: int
+    sample_width: int
+    sample_rate: int
+    data_offset: int
+    num_frames: int
+
+
+def read_wav_info(path: str) -> WavInfo:
+    """
+    Parses the RIFF header of a PCM WAV file without reading its samples.
+
+    Raises ValueError if the file is not an uncompressed PCM WAV file.
+    """
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12:
+            raise ValueError(f"{path} is too short to be a WAV file.")
+        riff, _, wave_id = struct.unpack("<4sI4s", header)
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path} is not a RIFF/WAVE file.")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no 'data' chunk.")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt_data = f.read(chunk_size)
+                if len(fmt_data) < 16:
+                    raise ValueError(f"{path} has a truncated 'fmt ' chunk.")
+                fmt = struct.unpack_from("<HHIIHH", fmt_data)
+                if fmt[0] == WAVE_FORMAT_EXTENSIBLE:
+                    # The actual sample format is the SubFormat GUID at the end of the extension.
+                    if len(fmt_data) < 40:
+                        raise ValueError(f"{path} has a truncated 'fmt ' chunk.")
+                    if fmt_data[24:40] == KSDATAFORMAT_SUBTYPE_PCM:
+                        fmt = (WAVE_FORMAT_PCM,) + fmt[1:]
+                f.seek(chunk_size & 1, 1)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"{path} has a 'data' chunk before its 'fmt ' chunk.")
+                audio_format, channels, sample_rate, _, block_align, bits = fmt
+                if audio_format != WAVE_FORMAT_PCM or bits // 8 not in SAMPLE_DTYPES:
+                    raise ValueError(f"{path} must be 8, 16 or 32-bit PCM (format={audio_format}, bits={bits}).")
+                return WavInfo(channels, bits // 8, sample_rate, f.tell(), chunk_size // block_align)
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def frame_energy(samples: np.ndarray, channels: int, frame_length: int) -> np.ndarray:
+    """Returns the mean squared amplitude of each `frame_length`-sample frame, across channels."""
+    num_frames = len(samples) // (frame_length * channels)
+    frames = samples[: num_frames * frame_length * channels].reshape(num_frames, frame_length * channels)
+    frames = frames.astype(np.float32)
+    if samples.dtype == np.uint8:
+        frames -= 128.0
+    return np.einsum("ij,ij->i", frames, frames) / frames.shape[1]
+
+
+def find_cut_points(samples: np.ndarray, info: WavInfo, segment_seconds: float, search_seconds: float) -> List[int]:
+    """
+    Chooses cut points (in sample frames) close to every `segment_seconds`.
+
+    Each cut lands in the quietest `SILENCE_SECONDS` stretch within
+    `search_seconds` of the nominal boundary. Energy is only computed for those
+    search windows, so memory use does not depend on the length of the file.
+    """
+    frame_length = max(1, int(info.sample_rate * FRAME_SECONDS))
+    smooth = max(1, int(SILENCE_SECONDS / FRAME_SECONDS))
+    segment = int(segment_seconds * info.sample_rate)
+    search = int(search_seconds * info.sample_rate)
+
+    cuts = []
+    position = 0
+    # Leave the tail as part of the last segment if it would be shorter than the search window.
+    while info.num_frames - position > segment + search:
+        start = max(position + 1, position + segment - search)
+        end = min(info.num_frames, position + segment + search)
+        window = samples[start * info.channels: end * info.channels]
+        energy = frame_energy(window, info.channels, frame_length)
+        if len(energy) >= smooth:
+            kernel = np.ones(smooth, dtype=np.float32) / smooth
+            quietness = np.convolve(energy, kernel, mode="valid")
+            best = int(np.argmin(quietness)) + smooth // 2
+        else:
+            best = int(np.argmin(energy)) if len(energy) else 0
+        cut = start + best * frame_length + frame_length // 2
+        cuts.append(cut)
+        position = cut
+    return cuts
+
+
+def _write_part(source: mmap.mmap, info: WavInfo, start: int, end: int, output_path: Path):
+    """Copies sample frames [start, end) from the mapped source into a new WAV file."""
+    frame_bytes = info.channels * info.sample_width
+    begin = info.data_offset + start * frame_bytes
+    stop = info.data_offset + end * frame_bytes
+    with wave.open(str(output_path), "wb") as out:
+        out.setnchannels(info.channels)
+        out.setsampwidth(info.sample_width)
+        out.setframerate(info.sample_rate)
+        out.setnframes(end - start)
+        view = memoryview(source)
+        try:
+            for offset in range(begin, stop, COPY_BLOCK_BYTES):
+                out.writeframesraw(view[offset: min(offset + COPY_BLOCK_BYTES, stop)])
+        finally:
+            view.release()
+
+
+def split_wav(audio_path: str, output_dir: str, segment_seconds: float, search_seconds: float = 15.0) -> List[Path]:
+    """
+    Splits a PCM WAV file into `<stem>_part_NNN.wav` files at silence-aligned cut points.
+
+    The source file is memory-mapped and streamed; parts are byte copies of the
+    original samples, so no re-encoding takes place.
+    """
+    source_path = Path(audio_path)
+    info = read_wav_info(str(source_path))
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    log.info(
+        f"Splitting {source_path.name}: {info.num_frames / info.sample_rate:.1f}s, "
+        f"{info.sample_rate} Hz, {info.channels} channel(s), {info.sample_width * 8}-bit."
+    )
+
+    parts = []
+    with open(source_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        samples = np.frombuffer(
+            mm,
+            dtype=SAMPLE_DTYPES[info.sample_width],
+            count=info.num_frames * info.channels,
+            offset=info.data_offset,
+        )
+        cuts = find_cut_points(samples, info, segment_seconds, search_seconds)
+        # Drop our reference before the map is closed; numpy views keep it pinned otherwise.
+        del samples
+
+        boundaries = [0] + cuts + [info.num_frames]
+        for index, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+            part_path = out_dir / f"{source_path.stem}_part_{index:03d}.wav"
+            _write_part(mm, info, start, end, part_path)
+            log.debug(f"Wrote {part_path.name} ({(end - start) / info.sample_rate:.1f}s)")
+            parts.append(part_path)
+    return parts
@@ -1,140 +1,621 @@
 import click
 import json
 from pathlib import Path
+from typing import Optional
 import glob
+import io
+import itertools
+import os
+import socket
+import time
+import wave
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from speech2text.logger_setup import log
-from speech2text.config import RECOGNITION_CONFIG, GCS_BUCKET_NAME
-from speech2text import speech_service, llm_service
+from speech2text.config import (
+    RECOGNITION_CONFIG, GCS_BUCKET_NAME, LLM_CACHE_DIR, LLM_CACHE_MAX_MB, LLM_CACHE_MAX_AGE_DAYS,
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_MAX_IN_FLIGHT, LLM_MAX_RETRIES,
+)
+from speech2text import speech_service, llm_service, post_processing, metrics, transcript_merge
+from speech2text.llm_scheduler import RequestScheduler
+from speech2text.manifest import JobManifest, MANIFEST_NAME
+from speech2text.job_queue import JobQueue, QUEUE_NAME, PENDING, RUNNING, DONE, FAILED
 
 # Define the path to the jobs directory
 JOBS_DIR = Path(__file__).parent.parent / "jobs"
-JOBS_DIR.mkdir(exist_ok=True)
+
+# How long a queue worker may hold a job before other workers can take it over.
+UPLOAD_LEASE_SECONDS = 3600
+CHECK_LEASE_SECONDS = 300
+# Base delay before a failed upload or submission is attempted again.
+QUEUE_RETRY_SECONDS = 60
 
 @click.group()
 def cli():
     """A CLI tool to transcribe and process audio files."""
     pass
 
+# Options shared by post-process and post-process-many.
+_POST_PROCESS_OPTIONS = [
+    click.option("--context-words", default=100, help="Number of words from the end of the document to use as context for the next chunk."),
+    click.option("--concurrency", default=post_processing.DEFAULT_CONCURRENCY, type=click.IntRange(min=1), help="Maximum number of chunks corrected in parallel during Phase 1."),
+    click.option("--cache-dir", type=click.Path(file_okay=False, resolve_path=True), default=LLM_CACHE_DIR, show_default=True, help="Directory for the on-disk LLM response cache."),
+    click.option("--no-cache", is_flag=True, default=False, help="Disable the LLM response cache."),
+    click.option("--fresh", is_flag=True, default=False, help="Ignore the checkpoints in the job manifest and recompute every step."),
+    click.option("--structure-mode", type=click.Choice(["chain", "tree"]), default="chain", show_default=True, help="'chain' joins chunks one after another; 'tree' structures windows of chunks in parallel and merges them in rounds."),
+    click.option("--tree-window", default=1, show_default=True, type=click.IntRange(min=1), help="Number of chunks structured together in 'tree' mode."),
+    click.option("--max-tokens-per-chunk", default=None, type=click.IntRange(min=100), help="Re-split the combined transcript at sentence boundaries into chunks of about this many tokens, instead of one chunk per part."),
+    click.option("--requests-per-minute", default=LLM_REQUESTS_PER_MINUTE, show_default=True, type=click.IntRange(min=1), help="Maximum LLM requests per minute."),
+    click.option("--tokens-per-minute", default=LLM_TOKENS_PER_MINUTE, show_default=True, type=click.IntRange(min=1), help="Maximum LLM tokens (prompt and response) per minute."),
+    click.option("--max-in-flight", default=LLM_MAX_IN_FLIGHT, show_default=True, type=click.IntRange(min=1), help="Maximum LLM requests running at the same time."),
+    click.option("--max-retries", default=LLM_MAX_RETRIES, show_default=True, type=click.IntRange(min=0), help="Retries of an LLM request failing with a rate-limit, timeout or server error."),
+]
+
+
+def _post_process_options(command):
+    for option in reversed(_POST_PROCESS_OPTIONS):
+        command = option(command)
+    return command
+
+
 @cli.command()
 @click.argument("job_directory", type=click.Path(exists=True, file_okay=False, resolve_path=True))
 @click.option("--output", type=click.Path(file_okay=True, dir_okay=False, resolve_path=True), default=None, help="Path for the output Markdown file.")
-@click.option("--context-words", default=100, help="Number of words from the end of the document to use as context for the next chunk.")
-def post_process(job_directory: str, output: str, context_words: int):
+@_post_process_options
+@click.option("--profile", is_flag=True, default=False, help="Print a breakdown of the time spent in each stage.")
+@click.option("--watch", is_flag=True, default=False, help="Keep watching the directory and process new parts as they appear, appending them to the document.")
+@click.option("--watch-interval", default=2.0, show_default=True, help="Seconds between checks for new parts in watch mode.")
+@click.option("--watch-idle", default=600.0, show_default=True, help="Stop watching after this many seconds without new parts.")
+@click.option("--stream", is_flag=True, default=False, help="Write each structured section to the output as the LLM generates it.")
+def post_process(job_directory: str, output: str, context_words: int, concurrency: int, cache_dir: str, no_cache: bool, fresh: bool, structure_mode: str, tree_window: int, max_tokens_per_chunk: int, requests_per_minute: int, tokens_per_minute: int, max_in_flight: int, max_retries: int, profile: bool, watch: bool, watch_interval: float, watch_idle: float, stream: bool):
     """
     Combines, corrects, and structures transcription JSON files into a Markdown document using an LLM.
     """
+    metrics.reset()
     log.info(f"Starting post-processing for job directory: {job_directory}")
     job_dir = Path(job_directory)
 
+    if watch and (structure_mode == "tree" or max_tokens_per_chunk):
+        log.error("[bold red]--watch only supports the 'chain' structure mode, without --max-tokens-per-chunk.[/bold red]")
+        return
+    if stream and structure_mode == "tree":
+        log.error("[bold red]--stream only supports the 'chain' structure mode.[/bold red]")
+        return
+
+    cache = _configure_cache(cache_dir, no_cache)
+    llm_service.configure_scheduler(requests_per_minute, tokens_per_minute, max_in_flight, max_retries)
+
+    done = _post_process_job(
+        job_dir, Path(output) if output else None, context_words, concurrency, fresh, structure_mode, tree_window,
+        max_tokens_per_chunk, profile, watch=watch, watch_interval=watch_interval, watch_idle=watch_idle, stream=stream,
+    )
+    if done and cache:
+        stats = cache.stats()
+        log.info(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses.")
+
+
+def _configure_cache(cache_dir: str, no_cache: bool):
+    """Sets up the LLM response cache for this process, or disables it."""
+    return llm_service.configure_cache(
+        None if no_cache else cache_dir,
+        max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+        max_age_seconds=LLM_CACHE_MAX_AGE_DAYS * 24 * 3600,
+    )
+
+
+def _post_process_job(
+    job_dir: Path,
+    output_path: Optional[Path],
+    context_words: int,
+    concurrency: int,
+    fresh: bool,
+    structure_mode: str,
+    tree_window: int,
+    max_tokens_per_chunk: Optional[int],
+    profile: bool = False,
+    watch: bool = False,
+    watch_interval: float = 2.0,
+    watch_idle: float = 600.0,
+    stream: bool = False,
+    show_progress: bool = True,
+) -> bool:
+    """
+    Post-processes one job directory with the LLM cache and scheduler already configured.
+
+    Returns whether a document was written.
+    """
     # --- 1. Find and sort transcription part files ---
     json_files = sorted(glob.glob(f"{job_dir}/*_part_*.json"))
-    if not json_files:
+    if not json_files and not watch:
         log.error(f"[bold red]No '_part_*.json' files found in {job_dir}.[/bold red]")
         log.error("Please specify a directory containing transcription parts.")
-        return
+        return False
 
     log.info(f"Found {len(json_files)} transcription parts to process.")
 
-    # --- 2. Phase 1: Individual Correction ---
-    corrected_chunks = []
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        transient=True,
-    ) as progress:
-        task = progress.add_task("Phase 1: Correcting text chunks...", total=len(json_files))
-        for i, file_path in enumerate(json_files):
-            progress.update(task, description=f"Phase 1: Correcting chunk {i+1}/{len(json_files)}")
+    # Checkpoints of earlier runs, so only changed parts are sent to the LLM again.
+    manifest = JobManifest(job_dir / MANIFEST_NAME) if fresh else JobManifest.load(job_dir)
+
+    if watch:
+        done = _watch_and_process(job_dir, output_path or job_dir.parent / f"{job_dir.name}.md", manifest, context_words, concurrency, watch_interval, watch_idle, stream)
+        _finish_metrics(job_dir / metrics.METRICS_DIR_NAME / "post_process.json", profile)
+        return done
+
+    # --- 2. Read the transcripts ---
+    parts = []
+    with metrics.span("post_process.read_parts"):
+        for file_path in json_files:
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     transcript = data.get("transcript", "")
                     if transcript:
-                        corrected = llm_service.correct_text_chunk(transcript)
-                        if corrected:
-                            corrected_chunks.append(corrected)
+                        parts.append((Path(file_path).name, transcript))
             except (json.JSONDecodeError, FileNotFoundError) as e:
                 log.warning(f"Could not read or parse {file_path}: {e}")
-        progress.update(task, completed=True, description="Phase 1 Complete.")
-    
-    if not corrected_chunks:
-        log.error("[bold red]No text could be extracted or corrected from the JSON files.[/bold red]")
-        return
 
-    log.info("All text chunks corrected successfully.")
+    if max_tokens_per_chunk and parts:
+        chunks = post_processing.rechunk((transcript for _, transcript in parts), max_tokens_per_chunk)
+        log.info(f"Re-chunked {len(parts)} parts into {len(chunks)} chunks of up to ~{max_tokens_per_chunk} tokens.")
+        parts = [(f"chunk_{index:04d}", chunk) for index, chunk in enumerate(chunks)]
 
-    # --- 3. Phase 2: Iterative Structuring and Joining ---
-    final_document = ""
-    with Progress(
+    # --- 3. Open the output document ---
+    if not output_path:
+        output_path = job_dir.parent / f"{job_dir.name}.md"
+
+    try:
+        output_file = open(output_path, "w", encoding="utf-8")
+    except IOError as e:
+        log.error(f"[bold red]Failed to write output file to {output_path}:[/bold red] {e}")
+        return False
+
+    # --- 4. Phase 1 and Phase 2, pipelined ---
+    # Corrections run concurrently in the background while the structuring
+    # stage consumes the corrected chunks in order as soon as they are ready.
+    # Each structured section is streamed to the output file as it is produced.
+    with output_file, Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
+        TextColumn("{task.completed:.0f}/{task.total:.0f}"),
         transient=True,
+        disable=not show_progress,
     ) as progress:
-        task = progress.add_task("Phase 2: Structuring document...", total=len(corrected_chunks))
-        
-        # Initialize document with the first chunk
-        progress.update(task, description="Phase 2: Structuring initial chunk...")
-        final_document = llm_service.structure_initial_chunk(corrected_chunks[0])
-        progress.update(task, advance=1)
-
-        # Iteratively join the rest of the chunks
-        for i, new_chunk in enumerate(corrected_chunks[1:]):
-            progress.update(task, description=f"Phase 2: Structuring and joining chunk {i+2}/{len(corrected_chunks)}")
-            
-            # Get the last ~N words as context
-            context = " ".join(final_document.split()[-context_words:])
-            
-            structured_addition = llm_service.structure_and_join_chunk(
-                previous_context=context,
-                new_chunk=new_chunk
+        document = post_processing.DocumentBuilder(output_file, context_words)
+        if stream:
+            document.on_write = lambda chars: progress.update(structure_task, description=f"Phase 2: Structuring document... ({chars:,} chars written)")
+        correct_task = progress.add_task("Phase 1: Correcting text chunks...", total=len(parts))
+        pipeline_started = time.perf_counter()
+        corrected_count = itertools.count(1)
+
+        def on_corrected(index: int):
+            progress.advance(correct_task)
+            if next(corrected_count) == len(parts):
+                metrics.record("post_process.phase1", time.perf_counter() - pipeline_started)
+
+        structure_steps = -(-len(parts) // tree_window) if structure_mode == "tree" else len(parts)
+        structure_task = progress.add_task("Phase 2: Structuring document...", total=structure_steps)
+
+        corrected_chunks = post_processing.iter_corrected_parts(
+            parts,
+            concurrency=concurrency,
+            manifest=manifest,
+            on_chunk_done=on_corrected,
+        )
+        if structure_mode == "tree":
+            sections = post_processing.structure_tree(
+                corrected_chunks,
+                concurrency=concurrency,
+                window=tree_window,
+                on_chunk_done=lambda index: progress.advance(structure_task),
             )
-            
-            if structured_addition:
-                final_document += "\n\n" + structured_addition
-            
-            progress.update(task, advance=1)
-        progress.update(task, completed=True, description="Phase 2 Complete.")
+            for section in sections:
+                document.append(section)
+        else:
+            post_processing.structure_chunks(
+                corrected_chunks,
+                document,
+                manifest=manifest,
+                on_chunk_done=lambda index: progress.advance(structure_task),
+                stream=stream,
+            )
+        progress.update(correct_task, description="Phase 1 Complete.")
+        progress.update(structure_task, completed=structure_steps, description="Phase 2 Complete.")
+        # Phase 2 overlaps Phase 1, so this is the wall time of the whole pipeline.
+        metrics.record("post_process.pipeline", time.perf_counter() - pipeline_started)
+
+    _finish_metrics(job_dir / metrics.METRICS_DIR_NAME / "post_process.json", profile)
+
+    if not document.sections_written:
+        log.error("[bold red]No text could be extracted or corrected from the JSON files.[/bold red]")
+        output_path.unlink()
+        return False
+
+    manifest.prune(name for name, _ in parts)
+    manifest.save()
 
     log.info("[bold green]Document structuring complete.[/bold green]")
+    log.info(f"Final Markdown document saved to: {output_path}")
+    return True
 
-    # --- 4. Save the final document ---
-    if output:
-        output_path = Path(output)
-    else:
-        output_path = job_dir.parent / f"{job_dir.name}.md"
-    
+
+def _watch_and_process(job_dir: Path, output_path: Path, manifest: JobManifest, context_words: int, concurrency: int, watch_interval: float, watch_idle: float, stream: bool) -> bool:
+    """Watch mode of post-process: structures parts as they appear, appending each one to the document."""
     try:
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(final_document)
-        log.info(f"Final Markdown document saved to: {output_path}")
+        output_file = open(output_path, "w", encoding="utf-8")
     except IOError as e:
         log.error(f"[bold red]Failed to write output file to {output_path}:[/bold red] {e}")
+        return False
+
+    log.info(f"Watching {job_dir} for new parts (stopping after {watch_idle:.0f}s without new parts, or on Ctrl+C)...")
+    found = itertools.count(1)
+    yielded_parts = []
+    with output_file:
+        document = post_processing.DocumentBuilder(output_file, context_words)
+        corrected_chunks = post_processing.iter_watched_parts(
+            job_dir,
+            concurrency=concurrency,
+            manifest=manifest,
+            poll_interval=watch_interval,
+            idle_timeout=watch_idle,
+            on_part_found=lambda name: log.info(f"New part {name} ({next(found)} so far), correcting..."),
+            on_part_yielded=yielded_parts.append,
+        )
+        try:
+            with metrics.span("post_process.pipeline"):
+                post_processing.structure_chunks(
+                    corrected_chunks,
+                    document,
+                    manifest=manifest,
+                    on_chunk_done=lambda index: log.info(f"Appended section {index + 1} to {output_path.name}."),
+                    stream=stream,
+                )
+        except KeyboardInterrupt:
+            log.info("Stopped watching.")
+        finally:
+            corrected_chunks.close()
+
+    if not document.sections_written:
+        manifest.save()
+        log.error("[bold red]No text could be extracted or corrected from the JSON files.[/bold red]")
+        output_path.unlink()
+        return False
+
+    # Drop checkpoints of parts that were removed or renumbered since an earlier run.
+    manifest.prune(yielded_parts)
+    manifest.save()
+    log.info(f"Final Markdown document saved to: {output_path}")
+    return True
+
+
+def _finish_metrics(path: Path, profile: bool):
+    """Saves the metrics of the current command and prints its stage breakdown if requested."""
+    metrics.get_metrics().write(path)
+    if profile:
+        metrics.print_profile(metrics.get_metrics().summary())
+    log.debug(f"Metrics saved to: {path}")
+
+
+def _job_size(job_dir: Path) -> int:
+    """Total size in bytes of a job's part files, used to schedule the largest jobs first."""
+    return sum(os.path.getsize(path) for path in glob.glob(f"{job_dir}/*_part_*.json"))
+
+
+def _init_post_process_worker(scheduler, cache_dir: str, no_cache: bool):
+    """Pool initializer: every worker process uses the shared LLM limits and the same cache."""
+    llm_service.set_scheduler(scheduler)
+    _configure_cache(cache_dir, no_cache)
+
+
+def _post_process_worker(job_dir: Path, output_path: Optional[Path], options: dict) -> dict:
+    """Post-processes one job in a worker process and returns its summary entry."""
+    metrics.reset()
+    started = time.perf_counter()
+    error = None
+    try:
+        if not _post_process_job(job_dir, output_path, show_progress=False, **options):
+            error = "No document was written; see the log for details."
+    except Exception as e:
+        log.error(f"[bold red]Post-processing of {job_dir.name} failed:[/bold red] {e}")
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "job": str(job_dir),
+        "status": "ERROR" if error else "DONE",
+        "seconds": round(time.perf_counter() - started, 3),
+        "output": str(output_path or job_dir.parent / f"{job_dir.name}.md"),
+        "error": error,
+    }
 
 
 @cli.command()
-@click.argument("audio_path", type=click.Path(exists=True))
-@click.option('--timeout', default=3600, help='Seconds to wait for the transcription to complete.')
-def transcribe(audio_path: str, timeout: int):
+@click.argument("patterns", nargs=-1, required=True)
+@click.option("--processes", default=min(4, os.cpu_count() or 1), show_default=True, type=click.IntRange(min=1), help="Jobs post-processed at the same time, each in its own process.")
+@click.option("--output-dir", type=click.Path(file_okay=False, resolve_path=True), default=None, help="Directory for the Markdown documents. Defaults to next to each job directory.")
+@click.option("--summary", "summary_path", type=click.Path(dir_okay=False, resolve_path=True), default=None, help="Path of the JSON summary. Defaults to jobs/metrics/post_process_many.json.")
+@_post_process_options
+def post_process_many(patterns, processes: int, output_dir: str, summary_path: str, context_words: int, concurrency: int, cache_dir: str, no_cache: bool, fresh: bool, structure_mode: str, tree_window: int, max_tokens_per_chunk: int, requests_per_minute: int, tokens_per_minute: int, max_in_flight: int, max_retries: int):
     """
-    Uploads an audio file, starts transcription, and waits for the result.
+    Post-processes every job directory matching the glob PATTERNS across a pool of processes.
+
+    All processes share a single LLM budget (requests and tokens per minute,
+    and requests in flight). The largest jobs are started first, so the batch
+    takes about as long as its largest job.
     """
+    candidates = sorted({Path(path).resolve() for pattern in patterns for path in glob.glob(pattern) if Path(path).is_dir()})
+    # Patterns like 'jobs/*' also match metrics and word timings directories; only folders with parts are jobs.
+    job_dirs = []
+    for directory in candidates:
+        if glob.glob(f"{glob.escape(str(directory))}/*_part_*.json"):
+            job_dirs.append(directory)
+        else:
+            log.debug(f"Skipping {directory}: no '_part_*.json' files.")
+    if not job_dirs:
+        log.error(f"[bold red]No job directories match {' '.join(patterns)}.[/bold red]")
+        return
+    sizes = {job_dir: _job_size(job_dir) for job_dir in job_dirs}
+    job_dirs.sort(key=lambda job_dir: sizes[job_dir], reverse=True)
+    processes = min(processes, len(job_dirs))
+    log.info(f"Post-processing {len(job_dirs)} jobs with {processes} processes.")
+
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    options = dict(
+        context_words=context_words, concurrency=concurrency, fresh=fresh, structure_mode=structure_mode,
+        tree_window=tree_window, max_tokens_per_chunk=max_tokens_per_chunk,
+    )
+    outputs = {job_dir: Path(output_dir) / f"{job_dir.name}.md" if output_dir else None for job_dir in job_dirs}
+
+    started = time.perf_counter()
+    results = []
+    if processes == 1:
+        # Nothing to share; run in this process and skip the pool's startup cost.
+        _init_post_process_worker(RequestScheduler(requests_per_minute, tokens_per_minute, max_in_flight, max_retries), cache_dir, no_cache)
+        for job_dir in job_dirs:
+            results.append(_post_process_worker(job_dir, outputs[job_dir], options))
+    else:
+        # Spawned rather than forked workers, so they behave the same on every platform.
+        context = multiprocessing.get_context("spawn")
+        scheduler = RequestScheduler(requests_per_minute, tokens_per_minute, max_in_flight, max_retries, context=context)
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_post_process_worker,
+            initargs=(scheduler, cache_dir, no_cache),
+        ) as executor:
+            futures = {executor.submit(_post_process_worker, job_dir, outputs[job_dir], options): job_dir for job_dir in job_dirs}
+            for future in as_completed(futures):
+                job_dir = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself died, e.g. killed for running out of memory.
+                    result = {"job": str(job_dir), "status": "ERROR", "seconds": None, "output": None, "error": f"{type(e).__name__}: {e}"}
+                results.append(result)
+                log.info(f"[{len(results)}/{len(job_dirs)}] {job_dir.name}: {result['status']}")
+    wall = time.perf_counter() - started
+
+    for result in results:
+        result["part_bytes"] = sizes[Path(result["job"])]
+    results.sort(key=lambda result: result["job"])
+    failed = [result for result in results if result["status"] != "DONE"]
+    summary = {
+        "jobs": len(results),
+        "failed": len(failed),
+        "processes": processes,
+        "wall_seconds": round(wall, 3),
+        "results": results,
+    }
+    summary_file = Path(summary_path) if summary_path else JOBS_DIR / metrics.METRICS_DIR_NAME / "post_process_many.json"
+    try:
+        summary_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(summary_file, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    except OSError as e:
+        log.warning(f"Could not write the summary to {summary_file}: {e}")
+
+    for result in results:
+        seconds = f"{result['seconds']:.1f}s" if result["seconds"] is not None else "-"
+        log.info(f"{result['status']:<5} {seconds:>8}  {Path(result['job']).name}" + (f" - {result['error']}" if result["error"] else ""))
+    log.info(f"Finished {len(results)} jobs in {wall:.1f}s: {len(results) - len(failed)} succeeded, {len(failed)} failed.")
+    log.info(f"Summary saved to: {summary_file}")
+
+
+def _parse_duration(ctx, param, value: str) -> float:
+    """Click callback that parses a duration given either in seconds or as HH:MM:SS."""
+    try:
+        seconds = 0.0
+        for field in value.split(":"):
+            seconds = seconds * 60 + float(field)
+    except ValueError:
+        raise click.BadParameter(f"'{value}' is not a duration in seconds or HH:MM:SS.")
+    if seconds <= 0:
+        raise click.BadParameter("Duration must be positive.")
+    return seconds
+
+
+@cli.command()
+@click.argument("audio_path", type=click.Path(exists=True, dir_okay=False, resolve_path=True))
+@click.option("--split-time", default="00:05:00", show_default=True, callback=_parse_duration, help="Target duration of each part, in seconds or HH:MM:SS.")
+@click.option("--search-window", default=15.0, show_default=True, help="Seconds around each target boundary to search for a silence to cut at.")
+@click.option("--output-dir", type=click.Path(file_okay=False, resolve_path=True), default=None, help="Directory for the parts. Defaults to the input file's directory.")
+def split(audio_path: str, split_time: float, search_window: float, output_dir: str):
+    """
+    Splits a PCM WAV file into '_part_NNN.wav' files, cutting at silences near the target duration.
+    """
+    # NumPy is only needed by this command, so it is imported here to keep CLI startup fast.
+    from speech2text import audio_splitter
+
+    output_dir = output_dir or str(Path(audio_path).parent)
+    convert_hint = "Convert the input to PCM WAV first, e.g. 'ffmpeg -i input.m4a -ar 16000 -ac 1 -c:a pcm_s16le output.wav'."
+
+    try:
+        info = audio_splitter.read_wav_info(audio_path)
+    except (ValueError, OSError) as e:
+        log.error(f"[bold red]Could not split {audio_path}:[/bold red] {e}")
+        log.error(convert_hint)
+        return
+    # The parts are sent as LINEAR16 (16-bit PCM) with the sample rate of RECOGNITION_CONFIG, which must be mono.
+    expected_rate = RECOGNITION_CONFIG["sample_rate_hertz"]
+    if info.sample_rate != expected_rate or info.channels != 1 or info.sample_width != 2:
+        log.error(
+            f"[bold red]{audio_path} is {info.sample_rate} Hz, {info.sample_width * 8}-bit with {info.channels} channel(s); "
+            f"transcription expects {expected_rate} Hz 16-bit mono.[/bold red]"
+        )
+        log.error(convert_hint)
+        return
+
+    try:
+        parts = audio_splitter.split_wav(audio_path, output_dir, split_time, search_window)
+    except (ValueError, OSError) as e:
+        log.error(f"[bold red]Could not split {audio_path}:[/bold red] {e}")
+        log.error(convert_hint)
+        return
+
+    log.info(f"[bold green]Audio file split into {len(parts)} parts in: {output_dir}[/bold green]")
+
+
+def _bucket_configured() -> bool:
+    """Checks that a GCS bucket is configured, logging instructions if it is not."""
     if not GCS_BUCKET_NAME or GCS_BUCKET_NAME == "your-gcs-bucket-name-here":
         log.error("[bold red]GCS_BUCKET_NAME is not configured in speech2text/config.py[/bold red]")
         log.error("Please create a GCS bucket and update the config file.")
+        return False
+    return True
+
+
+def _save_job_file(job_file: Path, job_data: dict):
+    """Writes the job details to its JSON file."""
+    with open(job_file, "w") as f:
+        json.dump(job_data, f, indent=4)
+
+
+def _job_result_data(job_name: str, operation_name: str, audio_path: Path, gcs_uri: str, result) -> dict:
+    """Builds the job details for a completed transcription."""
+    return {
+        "job_name": job_name,
+        "operation_name": operation_name,
+        "status": "DONE",
+        "audio_file": str(audio_path),
+        "gcs_uri": gcs_uri,
+        "transcript": speech_service.extract_transcript(result)
+    }
+
+
+def _save_job_result(job_file: Path, job_data: dict, result):
+    """
+    Writes a completed job's details to its JSON file and its word timings next to it.
+
+    Times of silence-trimmed audio are mapped back to the original recording.
+    Failing to store the word timings is logged but does not fail the job.
+    """
+    try:
+        from speech2text import word_timings
+        timings = word_timings.from_result(result)
+        timings = word_timings.to_original_timeline(timings, job_data.get("offset_map"))
+        path = word_timings.timings_path(job_file)
+        word_timings.save(timings, path)
+        job_data.update(word_timings=path.name, word_count=timings.num_words)
+    except Exception as e:
+        log.warning(f"Could not save word timings for {job_file.name}: {e}")
+    _save_job_file(job_file, job_data)
+
+
+def _job_error_data(job_name: str, operation_name: str, error: Exception) -> dict:
+    """Builds the job details for a failed transcription."""
+    return {
+        "job_name": job_name,
+        "operation_name": operation_name,
+        "status": "ERROR",
+        "error_message": str(error)
+    }
+
+
+def _upload_audio(audio_path: Path, flac: bool, trim_silence: bool):
+    """
+    Uploads an audio file, optionally trimming long silences and encoding it to FLAC first.
+
+    Returns the GCS URI (None if preparing or uploading the audio failed), the
+    recognition config matching the uploaded audio, and extra details to store
+    in the job file.
+    """
+    if not flac and not trim_silence:
+        gcs_uri = speech_service.upload_to_gcs(
+            local_file_path=str(audio_path),
+            bucket_name=GCS_BUCKET_NAME,
+            destination_blob_name=audio_path.name
+        )
+        return gcs_uri, RECOGNITION_CONFIG, {}
+
+    recognition_config = dict(RECOGNITION_CONFIG)
+    job_details = {}
+    source = str(audio_path)
+    try:
+        if trim_silence:
+            from speech2text import vad
+
+            with metrics.span("audio.trim_silence"):
+                trimmed = vad.trim_silence(str(audio_path))
+            if not trimmed.trimmed_seconds:
+                # The trimmed file would be a header without samples, which is not worth a recognition job.
+                log.warning(f"{audio_path.name} is all silence; uploading it untrimmed.")
+                trim_silence = False
+            else:
+                log.info(f"Trimmed {trimmed.trimmed_ratio:.0%} silence from {audio_path.name} ({trimmed.original_seconds:.0f}s -> {trimmed.trimmed_seconds:.0f}s).")
+                job_details = {"trimmed_ratio": round(trimmed.trimmed_ratio, 4), "offset_map": trimmed.offset_map}
+                data, source = trimmed.wav_data, io.BytesIO(trimmed.wav_data)
+                destination, content_type = f"{audio_path.stem}.trimmed.wav", "audio/wav"
+
+        if flac:
+            from speech2text import audio_encoding
+
+            with metrics.span("audio.encode_flac"):
+                data, sample_rate = audio_encoding.encode_flac(source)
+            log.info(f"Encoded {audio_path.name} as FLAC: {len(data) / max(1, audio_path.stat().st_size):.0%} of the original size.")
+            recognition_config.update(encoding="FLAC", sample_rate_hertz=sample_rate)
+            destination = f"{audio_path.stem}{'.trimmed' if trim_silence else ''}.flac"
+            content_type = "audio/flac"
+    except (RuntimeError, ValueError, OSError, EOFError, wave.Error) as e:
+        log.error(f"[bold red]Could not prepare {audio_path.name} for upload:[/bold red] {e}")
+        return None, recognition_config, job_details
+
+    if not flac and not trim_silence:
+        gcs_uri = speech_service.upload_to_gcs(
+            local_file_path=str(audio_path),
+            bucket_name=GCS_BUCKET_NAME,
+            destination_blob_name=audio_path.name
+        )
+        return gcs_uri, recognition_config, job_details
+    gcs_uri = speech_service.upload_bytes_to_gcs(
+        data,
+        bucket_name=GCS_BUCKET_NAME,
+        destination_blob_name=destination,
+        content_type=content_type
+    )
+    return gcs_uri, recognition_config, job_details
+
+
+@cli.command()
+@click.argument("audio_path", type=click.Path(exists=True))
+@click.option('--timeout', default=3600, help='Seconds to wait for the transcription to complete.')
+@click.option("--flac", is_flag=True, default=False, help="Losslessly compress the audio to FLAC before uploading it.")
+@click.option("--trim-silence", is_flag=True, default=False, help="Remove long silences before uploading; timestamps can be mapped back with the saved offset map.")
+@click.option("--profile", is_flag=True, default=False, help="Print a breakdown of the time spent in each stage.")
+def transcribe(audio_path: str, timeout: int, flac: bool, trim_silence: bool, profile: bool):
+    """
+    Uploads an audio file, starts transcription, and waits for the result.
+    """
+    if not _bucket_configured():
         return
+    metrics.reset()
 
     audio_path = Path(audio_path).resolve()
     job_name = audio_path.stem
+    JOBS_DIR.mkdir(exist_ok=True)
     job_file = JOBS_DIR / f"{job_name}.json"
 
     # 1. Upload to GCS
-    gcs_uri = speech_service.upload_to_gcs(
-        local_file_path=str(audio_path),
-        bucket_name=GCS_BUCKET_NAME,
-        destination_blob_name=audio_path.name
-    )
+    gcs_uri, recognition_config, job_details = _upload_audio(audio_path, flac, trim_silence)
 
     if not gcs_uri:
         log.error("[bold red]Could not start job because GCS upload failed.[/bold red]")
@@ -143,7 +624,7 @@ def transcribe(audio_path: str, timeout: int):
     # 2. Start transcription job
     operation = speech_service.start_transcription_job(
         gcs_uri=gcs_uri,
-        config=RECOGNITION_CONFIG
+        config=recognition_config
     )
 
     if not operation:
@@ -157,42 +638,365 @@ def transcribe(audio_path: str, timeout: int):
     try:
         # The .result() method blocks until the operation is complete
         # and returns the final result. It handles polling automatically.
-        result = operation.result(timeout=timeout)
+        with metrics.span("speech.recognition_wait"):
+            result = operation.result(timeout=timeout)
 
         log.info("[bold green]Job is DONE.[/bold green]")
         
-        transcript = ""
-        for res in result.results:
-            transcript += res.alternatives[0].transcript + "\n"
-        
         # 4. Save the final result to JSON
-        job_data = {
-            "job_name": job_name,
-            "operation_name": operation.operation.name,
-            "status": "DONE",
-            "audio_file": str(audio_path),
-            "gcs_uri": gcs_uri,
-            "transcript": transcript.strip()
-        }
-        
-        with open(job_file, "w") as f:
-            json.dump(job_data, f, indent=4)
+        job_data = _job_result_data(job_name, operation.operation.name, audio_path, gcs_uri, result)
+        job_data.update(job_details)
+        _save_job_result(job_file, job_data, result)
             
         log.info("--- Transcript ---")
-        log.info(transcript.strip())
+        log.info(job_data["transcript"])
         log.info("------------------")
         log.info(f"Full job details saved to: {job_file}")
 
     except Exception as e:
         log.error(f"[bold red]An error occurred while waiting for the result:[/bold red] {e}")
-        job_data = {
-            "job_name": job_name,
-            "operation_name": operation.name,
-            "status": "ERROR",
-            "error_message": str(e)
-        }
-        with open(job_file, "w") as f:
-            json.dump(job_data, f, indent=4)
+        metrics.increment("speech.recognition_errors")
+        _save_job_file(job_file, _job_error_data(job_name, operation.operation.name, e))
+
+    _finish_metrics(JOBS_DIR / metrics.METRICS_DIR_NAME / f"{job_name}.json", profile)
+
+
+@cli.command()
+@click.argument("input_dir", type=click.Path(exists=True, file_okay=False, resolve_path=True))
+@click.option("--pattern", default="*.wav", show_default=True, help="Glob pattern for the audio files to transcribe.")
+@click.option("--output-dir", type=click.Path(file_okay=False, resolve_path=True), default=None, help="Directory for the job JSON files. Defaults to the jobs directory.")
+@click.option("--upload-workers", default=8, show_default=True, type=click.IntRange(min=1), help="Number of files uploaded and submitted in parallel.")
+@click.option("--poll-interval", default=10.0, show_default=True, help="Seconds between status checks of the running operations.")
+@click.option('--timeout', default=3600, show_default=True, help='Seconds to wait for all transcriptions to complete.')
+@click.option("--flac", is_flag=True, default=False, help="Losslessly compress each file to FLAC before uploading it.")
+@click.option("--trim-silence", is_flag=True, default=False, help="Remove long silences from each file before uploading it.")
+@click.option("--profile", is_flag=True, default=False, help="Print a breakdown of the time spent in each stage.")
+def transcribe_dir(input_dir: str, pattern: str, output_dir: str, upload_workers: int, poll_interval: float, timeout: int, flac: bool, trim_silence: bool, profile: bool):
+    """
+    Transcribes every audio file in a directory, uploading and submitting them in parallel.
+    """
+    if not _bucket_configured():
+        return
+    metrics.reset()
+
+    audio_files = sorted(Path(input_dir).glob(pattern))
+    if not audio_files:
+        log.error(f"[bold red]No files matching '{pattern}' found in {input_dir}.[/bold red]")
+        return
+
+    jobs_dir = Path(output_dir) if output_dir else JOBS_DIR
+    jobs_dir.mkdir(parents=True, exist_ok=True)
+    log.info(f"Found {len(audio_files)} audio files to transcribe.")
+
+    # 1. Upload and submit every file, as soon as its upload completes.
+    def upload_and_submit(audio_path: Path):
+        gcs_uri, recognition_config, job_details = _upload_audio(audio_path, flac, trim_silence)
+        if not gcs_uri:
+            return None, None, {}
+        return gcs_uri, speech_service.start_transcription_job(gcs_uri=gcs_uri, config=recognition_config), job_details
+
+    operations = {}
+    gcs_uris = {}
+    details = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix="upload") as executor:
+        futures = {executor.submit(upload_and_submit, audio_path): audio_path for audio_path in audio_files}
+        for future in as_completed(futures):
+            audio_path = futures[future]
+            gcs_uri, operation, job_details = future.result()
+            if not operation:
+                log.error(f"[bold red]Could not start transcription for {audio_path.name}.[/bold red]")
+                failed += 1
+                continue
+            operations[audio_path] = operation
+            gcs_uris[audio_path] = gcs_uri
+            details[audio_path] = job_details
+
+    log.info(f"Submitted {len(operations)} transcription operations. Waiting for results... (Timeout: {timeout} seconds)")
+
+    # 2. Poll all operations together and save each result as soon as it is ready.
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        transient=True,
+    ) as progress:
+        task = progress.add_task(f"Waiting for {len(operations)} transcriptions...", total=len(operations))
+        for audio_path, result, error in speech_service.poll_operations(operations, poll_interval, timeout):
+            job_name = audio_path.stem
+            job_file = jobs_dir / f"{job_name}.json"
+            operation_name = operations[audio_path].operation.name
+            if error:
+                log.error(f"[bold red]Transcription of {audio_path.name} failed:[/bold red] {error}")
+                _save_job_file(job_file, _job_error_data(job_name, operation_name, error))
+                failed += 1
+            else:
+                job_data = _job_result_data(job_name, operation_name, audio_path, gcs_uris[audio_path], result)
+                job_data.update(details[audio_path])
+                _save_job_result(job_file, job_data, result)
+                log.info(f"[bold green]Job DONE:[/bold green] {job_file}")
+            progress.update(task, advance=1)
+
+    log.info(f"Finished: {len(audio_files) - failed} succeeded, {failed} failed.")
+    _finish_metrics(jobs_dir / metrics.METRICS_DIR_NAME / "transcribe_dir.json", profile)
+
+
+# --- Job queue ---
+
+_queue_option = click.option("--queue", "queue_path", type=click.Path(dir_okay=False, resolve_path=True), default=None, help=f"Path of the job queue database. Defaults to jobs/{QUEUE_NAME}.")
+_max_attempts_option = click.option("--max-attempts", default=3, show_default=True, type=click.IntRange(min=1), help="Failed uploads, submissions and status checks of a job before it is marked as failed.")
+
+
+def _open_queue(queue_path: str) -> JobQueue:
+    return JobQueue(Path(queue_path) if queue_path else JOBS_DIR / QUEUE_NAME)
+
+
+def _submit_queued_job(queue: JobQueue, job: dict, max_attempts: int, poll_interval: float):
+    """Uploads and submits a claimed PENDING job, rescheduling it with backoff if that fails."""
+    audio_path = Path(job["audio_file"])
+    options = job["options"]
+    attempts = job["attempts"] + 1
+    gcs_uri, recognition_config, job_details = _upload_audio(audio_path, options.get("flac", False), options.get("trim_silence", False))
+    operation = speech_service.start_transcription_job(gcs_uri=gcs_uri, config=recognition_config) if gcs_uri else None
+
+    if operation:
+        log.info(f"Submitted {audio_path.name}: {operation.operation.name}")
+        queue.update(
+            job["id"], state=RUNNING, attempts=attempts, gcs_uri=gcs_uri, operation_name=operation.operation.name,
+            details=job_details, error=None, not_before=time.time() + poll_interval,
+        )
+    elif attempts < max_attempts:
+        delay = QUEUE_RETRY_SECONDS * 2 ** (attempts - 1)
+        log.warning(f"Could not upload or submit {audio_path.name} (attempt {attempts}/{max_attempts}); retrying in {delay}s.")
+        queue.update(job["id"], attempts=attempts, error="Upload or submission failed.", not_before=time.time() + delay)
+    else:
+        log.error(f"[bold red]Giving up on {audio_path.name} after {attempts} attempts.[/bold red]")
+        queue.update(job["id"], state=FAILED, attempts=attempts, error="Upload or submission failed.")
+
+
+def _collect_queued_job(queue: JobQueue, job: dict, poll_interval: float, max_attempts: int) -> bool:
+    """
+    Checks a claimed RUNNING job once and saves its job file if it finished. Returns True if it did.
+
+    A failed check (e.g. an expired operation or bad credentials) counts as an
+    attempt, and the job is marked as failed once it has used up `max_attempts`.
+    """
+    try:
+        done, result, error = speech_service.check_operation(job["operation_name"])
+    except Exception as e:
+        attempts = job["attempts"] + 1
+        error = f"Could not check {job['operation_name']}: {e}"
+        if attempts < max_attempts:
+            log.warning(f"{error} (attempt {attempts}/{max_attempts})")
+            queue.update(job["id"], attempts=attempts, error=error, not_before=time.time() + poll_interval)
+        else:
+            log.error(f"[bold red]Giving up on {Path(job['audio_file']).name} after {attempts} attempts:[/bold red] {error}")
+            queue.update(job["id"], state=FAILED, attempts=attempts, error=error)
+        return False
+    if not done:
+        queue.update(job["id"], not_before=time.time() + poll_interval)
+        return False
+
+    output_dir = Path(job["output_dir"])
+    output_dir.mkdir(parents=True, exist_ok=True)
+    job_file = output_dir / f"{job['job_name']}.json"
+    if error:
+        log.error(f"[bold red]Transcription of {Path(job['audio_file']).name} failed:[/bold red] {error}")
+        _save_job_file(job_file, _job_error_data(job["job_name"], job["operation_name"], error))
+        queue.update(job["id"], state=FAILED, error=str(error))
+    else:
+        job_data = _job_result_data(job["job_name"], job["operation_name"], Path(job["audio_file"]), job["gcs_uri"], result)
+        job_data.update(job["details"])
+        _save_job_result(job_file, job_data, result)
+        log.info(f"[bold green]Job DONE:[/bold green] {job_file}")
+        queue.update(job["id"], state=DONE, error=None)
+    return True
+
+
+@cli.command()
+@click.argument("audio_paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, resolve_path=True))
+@_queue_option
+@click.option("--output-dir", type=click.Path(file_okay=False, resolve_path=True), default=None, help="Directory for the job JSON files. Defaults to the jobs directory.")
+@click.option("--flac", is_flag=True, default=False, help="Losslessly compress each file to FLAC before uploading it.")
+@click.option("--trim-silence", is_flag=True, default=False, help="Remove long silences from each file before uploading it.")
+def submit(audio_paths, queue_path: str, output_dir: str, flac: bool, trim_silence: bool):
+    """
+    Adds audio files to the job queue; 'worker' processes upload, submit and collect them.
+    """
+    queue = _open_queue(queue_path)
+    output_dir = output_dir or str(JOBS_DIR)
+    added = 0
+    for audio_path in audio_paths:
+        if queue.enqueue(audio_path, Path(audio_path).stem, output_dir, {"flac": flac, "trim_silence": trim_silence}):
+            added += 1
+        else:
+            log.info(f"{Path(audio_path).name} is already queued, skipping.")
+    log.info(f"Queued {added} files in {queue.path}. Run 'worker' to process them.")
+
+
+@cli.command()
+@_queue_option
+@click.option("--all", "show_all", is_flag=True, default=False, help="Also list the jobs that are done.")
+def status(queue_path: str, show_all: bool):
+    """
+    Shows the state of the jobs in the queue.
+    """
+    queue = _open_queue(queue_path)
+    counts = queue.counts()
+    log.info(", ".join(f"{state}: {count}" for state, count in counts.items()))
+    for job in queue.jobs(None if show_all else [PENDING, RUNNING, FAILED]):
+        line = f"{job['state']:<8} {Path(job['audio_file']).name} (attempts: {job['attempts']})"
+        if job["claimed_by"] and job["claimed_until"] > time.time():
+            line += f" [claimed by {job['claimed_by']}]"
+        if job["error"]:
+            line += f" - {job['error']}"
+        log.info(line)
+
+
+@cli.command()
+@_queue_option
+@_max_attempts_option
+def collect(queue_path: str, max_attempts: int):
+    """
+    Checks every running job in the queue once and saves the results that are ready, without waiting.
+    """
+    queue = _open_queue(queue_path)
+    worker = f"{socket.gethostname()}:{os.getpid()}:collect"
+    checked = []
+    collected = 0
+    while True:
+        job = queue.claim(RUNNING, worker, CHECK_LEASE_SECONDS, due_only=False, exclude=checked)
+        if job is None:
+            break
+        checked.append(job["id"])
+        collected += _collect_queued_job(queue, job, poll_interval=0, max_attempts=max_attempts)
+    log.info(f"Collected {collected} of {len(checked)} running jobs.")
+
+
+@cli.command()
+@_queue_option
+@click.option("--threads", default=4, show_default=True, type=click.IntRange(min=1), help="Jobs handled at the same time by this worker.")
+@click.option("--poll-interval", default=30.0, show_default=True, help="Seconds between checks of a running transcription.")
+@_max_attempts_option
+@click.option("--keep-running", is_flag=True, default=False, help="Keep waiting for new jobs instead of exiting when the queue is empty.")
+def worker(queue_path: str, threads: int, poll_interval: float, max_attempts: int, keep_running: bool):
+    """
+    Processes queued jobs: uploads and submits pending files and collects finished transcriptions.
+
+    Any number of workers, on this or other hosts sharing the queue file, can run at the same time.
+    """
+    if not _bucket_configured():
+        return
+    queue = _open_queue(queue_path)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def run(thread: int):
+        name = f"{worker_id}:{thread}"
+        while True:
+            job = queue.claim(PENDING, name, UPLOAD_LEASE_SECONDS)
+            if job:
+                _submit_queued_job(queue, job, max_attempts, poll_interval)
+                continue
+            job = queue.claim(RUNNING, name, CHECK_LEASE_SECONDS)
+            if job:
+                _collect_queued_job(queue, job, poll_interval, max_attempts)
+                continue
+            due = queue.next_due()
+            if due is None and not keep_running:
+                return
+            # Sleep until the next job is due, but wake up regularly to pick up newly submitted ones.
+            time.sleep(min(poll_interval, max(0.1, due - time.time())) if due else poll_interval)
+
+    log.info(f"Worker {worker_id} processing {queue.path} with {threads} threads.")
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="worker") as executor:
+        for future in [executor.submit(run, thread) for thread in range(threads)]:
+            future.result()
+    counts = queue.counts()
+    log.info(f"Queue drained: {counts[DONE]} done, {counts[FAILED]} failed.")
+
+
+@cli.command()
+@click.argument("job_directory", type=click.Path(exists=True, file_okay=False, resolve_path=True))
+@click.option("--output", type=click.Path(dir_okay=False, resolve_path=True), default=None, help="Path for the raw text file. Defaults to <job>_transcription_raw.txt next to the job directory.")
+@click.option("--workers", default=transcript_merge.DEFAULT_WORKERS, show_default=True, type=click.IntRange(min=1), help="Part files parsed in parallel.")
+@click.option("--dedup-overlap", default=0, show_default=True, type=click.IntRange(min=0), help="Remove up to this many words at the start of a part that repeat the end of the previous one (0 disables).")
+def merge(job_directory: str, output: str, workers: int, dedup_overlap: int):
+    """
+    Joins the raw transcripts of a job's parts, in order, into a single text file without using the LLM.
+    """
+    job_dir = Path(job_directory)
+    paths = transcript_merge.find_parts(job_dir)
+    if not paths:
+        log.error(f"[bold red]No JSON files found in {job_dir}.[/bold red]")
+        return
+    output_path = Path(output) if output else job_dir.parent / f"{job_dir.name}_transcription_raw.txt"
+
+    try:
+        output_file = open(output_path, "w", encoding="utf-8")
+    except IOError as e:
+        log.error(f"[bold red]Failed to write output file to {output_path}:[/bold red] {e}")
+        return
+    with output_file:
+        stats = transcript_merge.merge_parts(paths, output_file, workers=workers, dedup_overlap=dedup_overlap)
+
+    if not stats.parts:
+        log.error(f"[bold red]No transcriptions found in {job_dir}.[/bold red]")
+        output_path.unlink()
+        return
+    log.info(f"Merged {stats.parts} parts ({stats.skipped} without transcript skipped, {stats.words_removed} repeated words removed).")
+    log.info(f"Raw transcript saved to: {output_path}")
+
+
+def _index_path(jobs_dir: Path, index_path: str) -> Path:
+    from speech2text.search_index import INDEX_NAME
+    return Path(index_path) if index_path else jobs_dir / INDEX_NAME
+
+
+@cli.command()
+@click.argument("jobs_dir", type=click.Path(exists=True, file_okay=False, resolve_path=True), default=str(JOBS_DIR))
+@click.option("--index", "index_path", type=click.Path(dir_okay=False, resolve_path=True), default=None, help="Index database. Defaults to search_index.sqlite3 in JOBS_DIR.")
+def index(jobs_dir: str, index_path: str):
+    """
+    Builds or updates the full-text search index of the transcripts in JOBS_DIR.
+
+    Only files added or changed since the last run are read again.
+    """
+    from speech2text.search_index import SearchIndex
+    jobs_dir = Path(jobs_dir)
+    search_index = SearchIndex(_index_path(jobs_dir, index_path))
+    started = time.perf_counter()
+    stats = search_index.update(jobs_dir, on_file=lambda path: log.debug(f"Indexing {path}"))
+    totals = search_index.stats()
+    log.info(
+        f"Index updated in {time.perf_counter() - started:.2f}s: {stats['added']} added, {stats['updated']} updated, "
+        f"{stats['removed']} removed, {stats['unchanged']} unchanged ({totals['files']} files, {totals['terms']} distinct words)."
+    )
+
+
+@cli.command()
+@click.argument("query")
+@click.option("--jobs-dir", type=click.Path(exists=True, file_okay=False, resolve_path=True), default=str(JOBS_DIR), show_default=True, help="Directory that was indexed.")
+@click.option("--index", "index_path", type=click.Path(dir_okay=False, resolve_path=True), default=None, help="Index database. Defaults to search_index.sqlite3 in --jobs-dir.")
+@click.option("--limit", default=20, show_default=True, type=click.IntRange(min=1), help="Maximum number of matches to show.")
+def search(query: str, jobs_dir: str, index_path: str, limit: int):
+    """
+    Finds a word or phrase in the indexed transcripts, ignoring case and accents.
+    """
+    from speech2text.search_index import SearchIndex
+    jobs_dir = Path(jobs_dir)
+    path = _index_path(jobs_dir, index_path)
+    if not path.exists():
+        log.error(f"[bold red]No search index at {path}.[/bold red] Run 'index' first.")
+        return
+    started = time.perf_counter()
+    matches = SearchIndex(path).search(query, jobs_dir, limit=limit)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if not matches:
+        log.info(f"No matches for '{query}' ({elapsed_ms:.0f} ms).")
+        return
+    for match in matches:
+        log.info(f"{match.job} / {match.part} @ word {match.position}: {match.snippet}")
+    log.info(f"{len(matches)} matches{' (limit reached)' if len(matches) == limit else ''} in {elapsed_ms:.0f} ms.")
+
 
 if __name__ == "__main__":
     cli()
\ No newline at end of file
@@ -0,0 +1,57 @@
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable
+
+# The Google SDKs are slow to import, so they are only loaded when a client is
+# first requested.
+if TYPE_CHECKING:
+    import google.generativeai as genai
+    from google.cloud import speech, storage
+
+# Process-wide registry of API clients, so credential discovery and
+# gRPC/HTTP channel setup happen once per process instead of once per call.
+_clients: Dict[Hashable, Any] = {}
+_lock = threading.Lock()
+
+
+def _get_or_create(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """Returns the client registered under `key`, creating it on first use."""
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            # Another thread may have created it while we waited for the lock.
+            client = _clients.get(key)
+            if client is None:
+                client = factory()
+                _clients[key] = client
+    return client
+
+
+def get_storage_client() -> "storage.Client":
+    """Returns the shared Cloud Storage client."""
+    def create():
+        from google.cloud import storage
+        return storage.Client()
+    return _get_or_create("storage", create)
+
+
+def get_speech_client() -> "speech.SpeechClient":
+    """Returns the shared Speech-to-Text client."""
+    def create():
+        from google.cloud import speech
+        return speech.SpeechClient()
+    return _get_or_create("speech", create)
+
+
+def get_generative_model(model_name: str, api_key: str) -> "genai.GenerativeModel":
+    """Returns the shared generative model for `model_name`."""
+    def create():
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(model_name)
+    return _get_or_create(("generative_model", model_name), create)
+
+
+def clear():
+    """Drops every registered client; the next call creates fresh ones."""
+    with _lock:
+        _clients.clear()
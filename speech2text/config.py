@@ -1,7 +1,7 @@
 
 import os
+from pathlib import Path
 from dotenv import load_dotenv
-from google.cloud import speech
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,15 +16,36 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME")
 
 
+# --- LLM Response Cache ---
+# Responses from the LLM are cached on disk, keyed by model, prompt and inputs,
+# so re-running post-processing on unchanged parts costs nothing.
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", str(Path.home() / ".cache" / "speech2text" / "llm"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+LLM_CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+
+
+# --- LLM Request Limits ---
+# All Gemini requests are paced to stay within these quotas; set them to the
+# limits of your API tier. Failed requests that can be retried (rate limits,
+# timeouts, server errors) are retried up to LLM_MAX_RETRIES times.
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "1000"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "16"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+
+
 # --- Recognition Configuration ---
-# This dictionary is used to configure the Speech-to-Text API.
+# This dictionary is used to configure the Speech-to-Text API. It is kept as
+# plain data (enum values are given by name) and only converted to a
+# `speech.RecognitionConfig` when a job is submitted, so importing the config
+# does not load the Speech SDK.
 # See all available options here:
 # https://cloud.google.com/speech-to-text/docs/reference/rest/v1/RecognitionConfig
 
 RECOGNITION_CONFIG = {
     # --- Basic Audio Properties ---
     # These should match the audio file you are sending.
-    "encoding": speech.RecognitionConfig.AudioEncoding.LINEAR16,
+    "encoding": "LINEAR16",
     "sample_rate_hertz": 16000,
     "language_code": "es-419",
 
@@ -37,6 +58,11 @@ RECOGNITION_CONFIG = {
     # Automatic Punctuation: Adds periods, commas, and question marks.
     #"enable_automatic_punctuation": True,
 
+    # Word-level results: start/end times and confidence of every word, stored
+    # next to each job file (see `word_timings`).
+    "enable_word_time_offsets": True,
+    "enable_word_confidence": True,
+
     # Speaker Diarization: Identifies different speakers in the audio.
     # Uncomment the following lines if your audio has multiple speakers.
     #"enable_speaker_diarization": True,
@@ -0,0 +1,181 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+QUEUE_NAME = "queue.sqlite3"
+
+# Job states. A job is uploaded and submitted while PENDING, waits for its
+# recognition result while RUNNING, and ends up DONE or FAILED.
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+STATES = (PENDING, RUNNING, DONE, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    audio_file TEXT NOT NULL UNIQUE,
+    job_name TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}',
+    state TEXT NOT NULL DEFAULT 'PENDING',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    gcs_uri TEXT,
+    operation_name TEXT,
+    details TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    claimed_by TEXT,
+    claimed_until REAL NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, not_before);
+"""
+
+# Columns stored as JSON text.
+_JSON_COLUMNS = ("options", "details")
+
+
+def _to_dict(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    for column in _JSON_COLUMNS:
+        job[column] = json.loads(job[column])
+    return job
+
+
+class JobQueue:
+    """
+    Durable transcription job queue in a SQLite database.
+
+    Any number of worker processes, on one host or several sharing the file,
+    can claim jobs from the same queue. A claim is a lease: if a worker dies
+    while holding a job, the job becomes claimable again once the lease
+    expires. Every claim runs in an immediate transaction, so two workers
+    never claim the same job.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit mode, so transactions are opened explicitly where needed.
+        db = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def enqueue(self, audio_file: str, job_name: str, output_dir: str, options: Optional[dict] = None) -> bool:
+        """
+        Adds a job for `audio_file`. Returns False if the file is already queued.
+
+        A FAILED job for the same file is reset to PENDING instead.
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = db.execute(
+                    "INSERT OR IGNORE INTO jobs (audio_file, job_name, output_dir, options, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (audio_file, job_name, output_dir, json.dumps(options or {}), now, now),
+                )
+                added = cursor.rowcount == 1
+                if not added:
+                    cursor = db.execute(
+                        "UPDATE jobs SET state = ?, attempts = 0, error = NULL, options = ?, not_before = 0, updated_at = ? "
+                        "WHERE audio_file = ? AND state = ?",
+                        (PENDING, json.dumps(options or {}), now, audio_file, FAILED),
+                    )
+                    added = cursor.rowcount == 1
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return added
+
+    def claim(self, state: str, worker: str, lease_seconds: float, due_only: bool = True, exclude: Iterable[int] = ()) -> Optional[dict]:
+        """
+        Claims the oldest unclaimed job in `state` for `worker`, for `lease_seconds`.
+
+        Unless `due_only` is False, jobs scheduled for later are skipped. Jobs
+        whose id is in `exclude` are never claimed. Returns the job, or None if
+        there is nothing to do right now.
+        """
+        now = time.time()
+        exclude = list(exclude)
+        query = "SELECT * FROM jobs WHERE state = ? AND claimed_until <= ?"
+        params = [state, now]
+        if due_only:
+            query += " AND not_before <= ?"
+            params.append(now)
+        if exclude:
+            query += f" AND id NOT IN ({', '.join('?' * len(exclude))})"
+            params.extend(exclude)
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(query + " ORDER BY id LIMIT 1", params).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET claimed_by = ?, claimed_until = ?, updated_at = ? WHERE id = ?",
+                        (worker, now + lease_seconds, now, row["id"]),
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = _to_dict(row)
+        job["claimed_by"] = worker
+        return job
+
+    def update(self, job_id: int, release: bool = True, **fields):
+        """Updates fields of a job and, unless `release` is False, ends its lease."""
+        for column in _JSON_COLUMNS:
+            if column in fields:
+                fields[column] = json.dumps(fields[column])
+        fields["updated_at"] = time.time()
+        if release:
+            fields.update(claimed_by=None, claimed_until=0)
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as db:
+            db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of jobs in each state."""
+        with self._connect() as db:
+            rows = db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update({state: count for state, count in rows})
+        return counts
+
+    def jobs(self, states: Optional[List[str]] = None) -> List[dict]:
+        """Returns the jobs in the given states (all jobs by default), oldest first."""
+        states = list(states or STATES)
+        with self._connect() as db:
+            rows = db.execute(
+                f"SELECT * FROM jobs WHERE state IN ({', '.join('?' * len(states))}) ORDER BY id",
+                states,
+            ).fetchall()
+        return [_to_dict(row) for row in rows]
+
+    def next_due(self) -> Optional[float]:
+        """Returns when the next unfinished job becomes claimable, or None if there is none."""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT MIN(MAX(not_before, claimed_until)) FROM jobs WHERE state IN (?, ?)",
+                (PENDING, RUNNING),
+            ).fetchone()
+        return row[0]
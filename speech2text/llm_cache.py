@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from speech2text.logger_setup import log
+
+
+def make_key(model_name: str, template: str, **inputs) -> str:
+    """Builds a content-addressed cache key for a prompt and its inputs."""
+    payload = json.dumps(
+        {"model": model_name, "template": template, "inputs": inputs},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    A persistent, content-addressed on-disk cache for LLM responses.
+
+    Each entry is stored as a small JSON file named after its key. Entries older
+    than `max_age_seconds` are treated as misses and removed, and the least
+    recently used entries are evicted once the cache grows beyond `max_bytes`.
+    The cache is safe to share between threads and processes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, max_age_seconds: Optional[float] = 30 * 24 * 3600):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._scan()
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _is_expired(self, mtime: float) -> bool:
+        return self.max_age_seconds is not None and time.time() - mtime > self.max_age_seconds
+
+    def _scan(self):
+        """Computes the current cache size and drops expired entries."""
+        total = 0
+        for entry in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = entry.stat()
+                if self._is_expired(stat.st_mtime):
+                    entry.unlink()
+                else:
+                    total += stat.st_size
+            except OSError:
+                continue
+        self._total_bytes = total
+        self._evict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for `key`, or None on a miss."""
+        path = self._path_for(key)
+        try:
+            stat = path.stat()
+            if self._is_expired(stat.st_mtime):
+                path.unlink()
+                with self._lock:
+                    self._total_bytes -= stat.st_size
+                    self.misses += 1
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                response = json.load(f)["response"]
+            # Refresh the access time so eviction favours recently used entries.
+            os.utime(path, None)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return response
+
+    def put(self, key: str, response: str):
+        """Stores a response, evicting old entries if the size budget is exceeded."""
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"response": response}, f, ensure_ascii=False)
+        except OSError as e:
+            log.warning(f"Could not write LLM cache entry {key}: {e}")
+            return
+        with self._lock:
+            try:
+                # An entry written again (e.g. two threads correcting identical text) replaces the old file.
+                try:
+                    old_size = path.stat().st_size
+                except FileNotFoundError:
+                    old_size = 0
+                os.replace(tmp_path, path)
+                size = path.stat().st_size
+            except OSError as e:
+                log.warning(f"Could not write LLM cache entry {key}: {e}")
+                return
+            self._total_bytes += size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Removes the least recently used entries until the cache fits its budget."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        entries = []
+        for entry in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry))
+            except OSError:
+                continue
+        entries.sort()
+        # Evict down to 90% of the budget so we do not rescan on every put.
+        target = int(self.max_bytes * 0.9)
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            try:
+                entry.unlink()
+                total -= size
+            except OSError:
+                continue
+        self._total_bytes = total
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current size of the cache."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes": self._total_bytes}
@@ -0,0 +1,170 @@
+import random
+import threading
+import time
+from multiprocessing.context import BaseContext
+from typing import Callable, Optional, TypeVar
+
+from speech2text import metrics
+from speech2text.logger_setup import log
+
+T = TypeVar("T")
+
+# Rough number of characters per token for Gemini models on Spanish and
+# English text; good enough to size requests without calling the tokenizer.
+CHARS_PER_TOKEN = 4
+
+# Backoff between retries: full jitter over an exponentially growing window.
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 60.0
+
+# HTTP status codes of errors worth retrying: rate limits, timeouts and transient server errors.
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text: str) -> int:
+    """Returns a rough estimate of the number of tokens in `text`."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Tells whether a failed request may succeed if sent again.
+
+    Google API errors carry their HTTP status in `code`, so they are classified
+    without importing the SDK's exception classes.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    try:
+        return int(code) in RETRYABLE_STATUS_CODES
+    except (TypeError, ValueError):
+        return False
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `per_minute` tokens per minute.
+
+    The bucket holds at most one minute's worth of tokens, matching how
+    per-minute quotas are enforced. `acquire` blocks until enough tokens are
+    available; `adjust` corrects the balance once the real cost is known and
+    may leave it negative, which delays the following requests.
+
+    With a multiprocessing `context`, the balance lives in shared memory, so
+    the bucket can be handed to worker processes and limits all of them
+    together.
+    """
+
+    def __init__(self, per_minute: float, context: Optional[BaseContext] = None):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        # [tokens, last refill time]; time.monotonic() is system-wide, so it is comparable across processes.
+        initial = [self.capacity, time.monotonic()]
+        if context is None:
+            self._state = initial
+            self._lock = threading.Lock()
+        else:
+            self._state = context.RawArray("d", initial)
+            self._lock = context.Lock()
+
+    @property
+    def _tokens(self) -> float:
+        return self._state[0]
+
+    @_tokens.setter
+    def _tokens(self, value: float):
+        self._state[0] = value
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._state[1]) * self.rate)
+        self._state[1] = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Takes `amount` tokens, waiting for them if needed; returns the seconds waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def adjust(self, amount: float):
+        """Removes `amount` extra tokens (or returns them, if negative)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class RequestScheduler:
+    """
+    Paces, limits and retries requests to the LLM API.
+
+    Every request first takes one token from the requests-per-minute bucket
+    and its estimated size from the tokens-per-minute bucket, then waits for
+    one of `max_in_flight` slots. Requests failing with a retryable error are
+    retried with exponential backoff and full jitter, up to `max_retries`
+    times; other errors, and the last retryable one, are raised.
+
+    With a multiprocessing `context`, the limits are kept in shared memory and
+    apply to every process the scheduler is passed to, e.g. as a pool
+    initializer argument.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_in_flight: int,
+        max_retries: int,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        context: Optional[BaseContext] = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute, context)
+        self.tokens = TokenBucket(tokens_per_minute, context)
+        self.max_retries = max_retries
+        self.base_delay = RETRY_BASE_SECONDS if base_delay is None else base_delay
+        self.max_delay = RETRY_MAX_SECONDS if max_delay is None else max_delay
+        self._slots = (context or threading).BoundedSemaphore(max_in_flight)
+
+    def backoff(self, attempt: int) -> float:
+        """Returns the delay before retry number `attempt` (starting at 0)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, request: Callable[[], T], estimated_tokens: int, actual_tokens: Optional[Callable[[T], Optional[int]]] = None) -> T:
+        """
+        Runs `request` within the limits, retrying it on retryable errors.
+
+        `actual_tokens`, if given, extracts the real token usage from the
+        response so the tokens-per-minute bucket can be corrected.
+        """
+        attempt = 0
+        while True:
+            waited = self.requests.acquire(1) + self.tokens.acquire(estimated_tokens)
+            if waited:
+                metrics.record("llm.throttle_wait", waited)
+            try:
+                with self._slots:
+                    response = request()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                attempt += 1
+                metrics.increment("llm.retries")
+                log.warning(f"LLM request failed ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s.")
+                time.sleep(delay)
+                continue
+
+            if actual_tokens:
+                used = actual_tokens(response)
+                if used is not None:
+                    self.tokens.adjust(used - estimated_tokens)
+            return response
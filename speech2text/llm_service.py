@@ -1,18 +1,59 @@
 
-import google.generativeai as genai
-from speech2text.config import GEMINI_API_KEY
+import time
+from typing import Optional, Protocol
+
+from speech2text import clients, metrics
+from speech2text.config import (
+    GEMINI_API_KEY,
+    LLM_MAX_IN_FLIGHT,
+    LLM_MAX_RETRIES,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+)
+from speech2text.llm_cache import ResponseCache, make_key
+from speech2text.llm_scheduler import RequestScheduler, estimate_tokens
 from speech2text.logger_setup import log
 
-# Configure the generative AI model
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+MODEL_NAME = 'gemini-1.5-flash'
+
+# Optional on-disk response cache, enabled via `configure_cache`.
+_cache: Optional[ResponseCache] = None
+
+# Paces and retries every request to the model; replaced via `configure_scheduler`.
+_scheduler = RequestScheduler(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_MAX_IN_FLIGHT, LLM_MAX_RETRIES)
 
 def get_model():
-    """Initializes and returns the generative model."""
+    """Returns the shared generative model, creating it on first use."""
     if not GEMINI_API_KEY:
         log.error("[bold red]GEMINI_API_KEY environment variable not set.[/bold red]")
         return None
-    return genai.GenerativeModel('gemini-1.5-flash')
+    return clients.get_generative_model(MODEL_NAME, GEMINI_API_KEY)
+
+def configure_cache(cache_dir: Optional[str], **kwargs) -> Optional[ResponseCache]:
+    """Enables the response cache in `cache_dir`, or disables it when None."""
+    global _cache
+    _cache = ResponseCache(cache_dir, **kwargs) if cache_dir else None
+    return _cache
+
+def get_cache() -> Optional[ResponseCache]:
+    """Returns the active response cache, if any."""
+    return _cache
+
+def configure_scheduler(
+    requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+    max_in_flight: int = LLM_MAX_IN_FLIGHT,
+    max_retries: int = LLM_MAX_RETRIES,
+    **kwargs,
+) -> RequestScheduler:
+    """Replaces the request scheduler, e.g. to apply the quota of a different API tier."""
+    return set_scheduler(RequestScheduler(requests_per_minute, tokens_per_minute, max_in_flight, max_retries, **kwargs))
+
+def set_scheduler(scheduler: RequestScheduler) -> RequestScheduler:
+    """Uses an existing scheduler, e.g. one whose limits are shared with other processes."""
+    global _scheduler
+    _scheduler = scheduler
+    return _scheduler
 
 # --- Prompts ---
 
@@ -70,58 +111,175 @@ New text chunk to structure and append:
 ---
 """
 
+MERGE_SECTIONS_PROMPT = """
+You are a text-processing assistant assembling a Markdown document in Spanish.
+You will be given two consecutive parts of the same document, which were structured independently.
+Your task is to merge them into a single coherent Markdown text.
+
+Please perform the following actions:
+1. Keep all of the content of both parts, in the same order. Do not summarize.
+2. If the second part continues the last topic of the first part, join them under a single heading instead of repeating it.
+3. Remove content that is duplicated at the boundary between the two parts.
+4. Make the heading levels consistent and ensure a natural transition between the parts.
+5. Return ONLY the merged Markdown content.
+
+First part:
+---
+{first_section}
+---
+
+Second part:
+---
+{second_section}
+---
+"""
+
+# Short names of the prompts, used to label their metrics.
+PROMPT_NAMES = {
+    CORRECTION_PROMPT: "correct",
+    INITIAL_STRUCTURE_PROMPT: "structure_initial",
+    ITERATIVE_JOIN_PROMPT: "structure_join",
+    MERGE_SECTIONS_PROMPT: "merge",
+}
+
+class TextStream(Protocol):
+    """Receives a response as it is generated."""
+
+    def write(self, text: str):
+        """Called with each new piece of the response."""
+
+    def reset(self):
+        """Called when a partially streamed response is discarded, e.g. before a retry."""
+
 # --- Service Functions ---
 
-def correct_text_chunk(text_chunk: str) -> str:
-    """Uses the LLM to correct a single chunk of text."""
+def _generate(template: str, stream: Optional[TextStream] = None, **inputs) -> str:
+    """
+    Fills `template` with `inputs`, sends it to the model and returns the stripped text.
+
+    Responses are served from and stored in the response cache when it is enabled.
+    Requests go through the scheduler, which retries transient failures; other
+    errors, and transient ones that persist, are propagated to the caller.
+    With a `stream`, the response is requested in streaming mode and passed on
+    piece by piece as it is generated; the full text is still returned.
+    """
+    name = PROMPT_NAMES.get(template, "other")
+    key = make_key(MODEL_NAME, template, **inputs) if _cache else None
+    if key:
+        cached = _cache.get(key)
+        if cached is not None:
+            log.debug(f"LLM cache hit: {key[:12]}")
+            metrics.increment("llm.cache_hits")
+            if stream:
+                stream.write(cached)
+            return cached
+
     model = get_model()
     if not model:
         return ""
 
+    prompt = template.format(**inputs)
+    metrics.increment(f"llm.{name}.calls")
+    try:
+        with metrics.span(f"llm.{name}"):
+            # The response is usually about as long as the text in the prompt.
+            response = _scheduler.call(
+                (lambda: _stream_content(model, prompt, stream)) if stream else (lambda: model.generate_content(prompt)),
+                estimated_tokens=2 * estimate_tokens(prompt),
+                actual_tokens=_total_tokens,
+            )
+    except Exception:
+        metrics.increment(f"llm.{name}.errors")
+        raise
+    _record_usage(response)
+    text = response.text.strip()
+    if key and text:
+        _cache.put(key, text)
+    return text
+
+def _stream_content(model, prompt: str, stream: TextStream):
+    """Requests a streamed response, passing each piece to `stream`, and returns the complete response."""
+    # Discard anything written by a previous, failed attempt.
+    stream.reset()
+    started = time.perf_counter()
+    response = model.generate_content(prompt, stream=True)
+    first = True
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts, e.g. a final chunk with only a finish reason.
+            continue
+        if first and text:
+            metrics.record("llm.time_to_first_text", time.perf_counter() - started)
+            first = False
+        stream.write(text)
+    return response
+
+def _total_tokens(response) -> Optional[int]:
+    """Returns the total token count reported for a response, if any."""
+    count = getattr(getattr(response, "usage_metadata", None), "total_token_count", None)
+    return count if isinstance(count, int) else None
+
+def _record_usage(response):
+    """Records the prompt and response token counts reported by the API, if any."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for field, name in (("prompt_token_count", "llm.prompt_tokens"), ("candidates_token_count", "llm.response_tokens")):
+        count = getattr(usage, field, None)
+        if isinstance(count, int):
+            metrics.observe(name, count)
+
+def correct_text_chunk(text_chunk: str) -> str:
+    """Uses the LLM to correct a single chunk of text."""
     try:
         log.debug(f"Sending chunk for correction: {text_chunk[:100]}...")
-        prompt = CORRECTION_PROMPT.format(text_chunk=text_chunk)
-        response = model.generate_content(prompt)
-        corrected_text = response.text.strip()
+        corrected_text = _generate(CORRECTION_PROMPT, text_chunk=text_chunk)
         log.debug(f"Received corrected chunk: {corrected_text[:100]}...")
         return corrected_text
     except Exception as e:
         log.error(f"[bold red]Error during text correction LLM call:[/bold red] {e}")
         return ""
 
-def structure_initial_chunk(text_chunk: str) -> str:
-    """Uses the LLM to structure the very first chunk of the document."""
-    model = get_model()
-    if not model:
-        return ""
-
+def structure_initial_chunk(text_chunk: str, stream: Optional[TextStream] = None) -> str:
+    """Uses the LLM to structure the very first chunk of the document, optionally streaming the result."""
     try:
         log.debug(f"Sending initial chunk for structuring: {text_chunk[:100]}...")
-        prompt = INITIAL_STRUCTURE_PROMPT.format(text_chunk=text_chunk)
-        response = model.generate_content(prompt)
-        structured_doc = response.text.strip()
+        structured_doc = _generate(INITIAL_STRUCTURE_PROMPT, stream=stream, text_chunk=text_chunk)
         log.debug(f"Received initial structured document: {structured_doc[:150]}...")
         return structured_doc
     except Exception as e:
         log.error(f"[bold red]Error during initial structuring LLM call:[/bold red] {e}")
         return ""
 
-def structure_and_join_chunk(previous_context: str, new_chunk: str) -> str:
-    """Uses the LLM to structure a new chunk and join it to the document."""
-    model = get_model()
-    if not model:
-        return ""
-
+def structure_and_join_chunk(previous_context: str, new_chunk: str, stream: Optional[TextStream] = None) -> str:
+    """Uses the LLM to structure a new chunk and join it to the document, optionally streaming the result."""
     try:
         log.debug(f"Sending new chunk for iterative join: {new_chunk[:100]}...")
-        prompt = ITERATIVE_JOIN_PROMPT.format(
+        newly_structured_text = _generate(
+            ITERATIVE_JOIN_PROMPT,
+            stream=stream,
             previous_context=previous_context,
             new_chunk=new_chunk
         )
-        response = model.generate_content(prompt)
-        newly_structured_text = response.text.strip()
         log.debug(f"Received newly structured text: {newly_structured_text[:150]}...")
         return newly_structured_text
     except Exception as e:
         log.error(f"[bold red]Error during iterative join LLM call:[/bold red] {e}")
         return ""
+
+def merge_sections(first_section: str, second_section: str) -> str:
+    """Uses the LLM to merge two consecutive, independently structured sections."""
+    try:
+        log.debug(f"Sending sections for merging: {first_section[:50]}... / {second_section[:50]}...")
+        merged = _generate(
+            MERGE_SECTIONS_PROMPT,
+            first_section=first_section,
+            second_section=second_section
+        )
+        log.debug(f"Received merged sections: {merged[:150]}...")
+        return merged
+    except Exception as e:
+        log.error(f"[bold red]Error during section merge LLM call:[/bold red] {e}")
+        return ""
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from speech2text.logger_setup import log
+
+MANIFEST_NAME = "post_process_manifest.json"
+CHECKPOINT_DIR_NAME = "post_process_checkpoints"
+MANIFEST_VERSION = 2
+
+
+def content_hash(*parts: str) -> str:
+    """Returns a SHA-256 hex digest over the given strings."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") hash differently.
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class JobManifest:
+    """
+    Checkpoints of a post-processing run, stored next to the job's part files.
+
+    Phase 1 results are keyed by part file name and the hash of its transcript.
+    Phase 2 results are stored per position in the join chain, keyed by a hash
+    of the exact inputs of that step, so a step is reused only if neither its
+    chunk nor the document context before it changed.
+
+    The manifest itself only holds hashes; the checkpointed texts live in
+    content-addressed files under `CHECKPOINT_DIR_NAME`, so neither memory use
+    nor the cost of saving the manifest grows with the size of the document.
+    """
+
+    def __init__(self, path: Path, data: Optional[dict] = None):
+        self.path = Path(path)
+        self.checkpoint_dir = self.path.parent / CHECKPOINT_DIR_NAME
+        data = data or {}
+        self.corrected = data.get("corrected", {})
+        self.structured = data.get("structured", [])
+        # Phase 1 checkpoints are written from worker threads.
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, job_dir: Path) -> "JobManifest":
+        """Loads the manifest of `job_dir`, or returns an empty one if missing or unreadable."""
+        path = Path(job_dir) / MANIFEST_NAME
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                log.warning(f"Ignoring manifest {path} with unsupported version {data.get('version')}.")
+                data = None
+        except FileNotFoundError:
+            data = None
+        except (OSError, ValueError) as e:
+            log.warning(f"Could not read manifest {path}, starting from scratch: {e}")
+            data = None
+        return cls(path, data)
+
+    def save(self):
+        """Atomically writes the manifest to disk."""
+        with self._lock:
+            data = {"version": MANIFEST_VERSION, "corrected": dict(self.corrected), "structured": list(self.structured)}
+            self._write_atomic(self.path, json.dumps(data, indent=2))
+
+    def _write_atomic(self, path: Path, text: str):
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log.warning(f"Could not write checkpoint {path}: {e}")
+
+    def _checkpoint_path(self, kind: str, key: str) -> Path:
+        return self.checkpoint_dir / f"{kind}_{key}.txt"
+
+    def _read_checkpoint(self, kind: str, key: str) -> Optional[str]:
+        try:
+            with open(self._checkpoint_path(kind, key), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_checkpoint(self, kind: str, key: str, text: str):
+        self.checkpoint_dir.mkdir(exist_ok=True)
+        self._write_atomic(self._checkpoint_path(kind, key), text)
+
+    def get_corrected(self, part_name: str, input_hash: str) -> Optional[str]:
+        """Returns the checkpointed correction of a part if its input is unchanged."""
+        if self.corrected.get(part_name) == input_hash:
+            return self._read_checkpoint("corrected", input_hash)
+        return None
+
+    def set_corrected(self, part_name: str, input_hash: str, output: str):
+        self._write_checkpoint("corrected", input_hash, output)
+        with self._lock:
+            self.corrected[part_name] = input_hash
+
+    def get_structured(self, index: int, step_hash: str) -> Optional[str]:
+        """Returns the checkpointed output of a join-chain step if its inputs are unchanged."""
+        if index < len(self.structured) and self.structured[index] == step_hash:
+            return self._read_checkpoint("structured", step_hash)
+        return None
+
+    def set_structured(self, index: int, step_hash: str, output: str):
+        self._write_checkpoint("structured", step_hash, output)
+        with self._lock:
+            if index >= len(self.structured):
+                self.structured.extend([None] * (index + 1 - len(self.structured)))
+            self.structured[index] = step_hash
+
+    def truncate_structured(self, chain_length: int):
+        """Drops checkpoints of join-chain steps past the end of the current chain."""
+        with self._lock:
+            del self.structured[chain_length:]
+
+    def prune(self, part_names):
+        """Drops checkpoints of parts that no longer exist and deletes unreferenced checkpoint files."""
+        part_names = set(part_names)
+        with self._lock:
+            self.corrected = {name: key for name, key in self.corrected.items() if name in part_names}
+            referenced = {self._checkpoint_path("corrected", key) for key in self.corrected.values()}
+            referenced |= {self._checkpoint_path("structured", key) for key in self.structured if key}
+        if not self.checkpoint_dir.is_dir():
+            return
+        for path in self.checkpoint_dir.iterdir():
+            if path not in referenced:
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
@@ -0,0 +1,169 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from speech2text.logger_setup import log
+
+# Jobs keep their metrics in this sub-directory, out of the way of the part files.
+METRICS_DIR_NAME = "metrics"
+
+# Upper bounds, in milliseconds, of the latency histogram buckets.
+LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Returns the `fraction` percentile of sorted `values` (nearest rank)."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _histogram(seconds: List[float]) -> Dict[str, int]:
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for value in seconds:
+        counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value * 1000)] += 1
+    labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+    return {label: count for label, count in zip(labels, counts) if count}
+
+
+class Metrics:
+    """
+    Thread-safe collector of stage timings, counters and observed values.
+
+    Timings are recorded with `span`, event counts with `increment`, and
+    numeric samples such as token counts with `observe`. Every series is
+    keyed by a dotted name, e.g. `llm.correct` or `gcs.upload`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.timings: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.values: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Times the enclosed block and records it under `name`, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.timings.setdefault(name, []).append(seconds)
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self.values.setdefault(name, []).append(value)
+
+    def summary(self) -> dict:
+        """Returns the collected metrics as a JSON-serializable dict."""
+        with self._lock:
+            timings = {name: sorted(values) for name, values in self.timings.items()}
+            values = {name: sorted(samples) for name, samples in self.values.items()}
+            counters = dict(self.counters)
+
+        stages = {}
+        for name, seconds in sorted(timings.items()):
+            stages[name] = {
+                "count": len(seconds),
+                "total_seconds": round(sum(seconds), 4),
+                "mean_seconds": round(sum(seconds) / len(seconds), 4),
+                "p50_seconds": round(_percentile(seconds, 0.5), 4),
+                "p90_seconds": round(_percentile(seconds, 0.9), 4),
+                "p99_seconds": round(_percentile(seconds, 0.99), 4),
+                "max_seconds": round(seconds[-1], 4),
+                "histogram": _histogram(seconds),
+            }
+        observed = {
+            name: {"count": len(samples), "total": sum(samples), "mean": round(sum(samples) / len(samples), 2), "max": samples[-1]}
+            for name, samples in sorted(values.items())
+        }
+        return {
+            "started": self.started,
+            "elapsed_seconds": round(time.time() - self.started, 4),
+            "stages": stages,
+            "counters": dict(sorted(counters.items())),
+            "values": observed,
+        }
+
+    def write(self, path: Path):
+        """Writes the summary to a JSON file, creating its directory if needed."""
+        path = Path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.summary(), f, indent=2)
+        except OSError as e:
+            log.warning(f"Could not write metrics to {path}: {e}")
+
+
+# Metrics of the command currently running in this process.
+_metrics = Metrics()
+
+
+def reset() -> Metrics:
+    """Starts a fresh set of metrics, e.g. at the beginning of a command."""
+    global _metrics
+    _metrics = Metrics()
+    return _metrics
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def span(name: str):
+    """Times the enclosed block in the current metrics."""
+    return _metrics.span(name)
+
+
+def record(name: str, seconds: float):
+    _metrics.record(name, seconds)
+
+
+def increment(name: str, amount: int = 1):
+    _metrics.increment(name, amount)
+
+
+def observe(name: str, value: float):
+    _metrics.observe(name, value)
+
+
+def print_profile(summary: dict):
+    """Prints a per-stage breakdown of a metrics summary as a table."""
+    from rich.console import Console
+    from rich.table import Table
+
+    elapsed = summary["elapsed_seconds"] or 1.0
+    table = Table(title=f"Profile ({summary['elapsed_seconds']:.2f}s elapsed)")
+    for column in ("stage", "count", "total s", "% wall", "mean s", "p90 s", "max s"):
+        if column == "stage":
+            table.add_column(column, no_wrap=True)
+        else:
+            table.add_column(column, justify="right")
+    # Concurrent spans of the same stage add up, so "% wall" can exceed 100%.
+    for name, stage in summary["stages"].items():
+        table.add_row(
+            name,
+            str(stage["count"]),
+            f"{stage['total_seconds']:.2f}",
+            f"{stage['total_seconds'] / elapsed:.0%}",
+            f"{stage['mean_seconds']:.3f}",
+            f"{stage['p90_seconds']:.3f}",
+            f"{stage['max_seconds']:.3f}",
+        )
+    for name, value in summary["values"].items():
+        table.add_row(name, str(value["count"]), f"{value['total']:.0f}", "", f"{value['mean']:.0f}", "", f"{value['max']:.0f}")
+    for name, count in summary["counters"].items():
+        table.add_row(name, str(count), "", "", "", "", "")
+    Console().print(table)
@@ -0,0 +1,517 @@
+import json
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from speech2text import llm_service
+from speech2text.llm_scheduler import CHARS_PER_TOKEN
+from speech2text.logger_setup import log
+from speech2text.manifest import JobManifest, content_hash
+
+# Default number of LLM requests allowed in flight during Phase 1.
+DEFAULT_CONCURRENCY = 8
+
+# Sections are only merged while the result stays below this many words, so
+# the merged output remains well within what the model can return in one call.
+DEFAULT_MAX_MERGE_WORDS = 3000
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+_PART_INDEX = re.compile(r"_part_(\d+)\.json$")
+
+
+def _split_sentences(text: str, max_tokens: int) -> Iterator[str]:
+    """Yields the sentences of `text`, breaking sentences longer than `max_tokens` at word boundaries."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    for sentence in _SENTENCE_END.split(text):
+        if len(sentence) <= max_chars:
+            yield sentence
+            continue
+        piece = []
+        length = -1
+        for word in sentence.split():
+            if piece and length + 1 + len(word) > max_chars:
+                yield " ".join(piece)
+                piece, length = [], -1
+            piece.append(word)
+            length += 1 + len(word)
+        if piece:
+            yield " ".join(piece)
+
+
+def rechunk(transcripts: Iterable[str], max_tokens: int) -> List[str]:
+    """
+    Concatenates the transcripts and re-splits them into chunks of at most
+    `max_tokens` estimated tokens, cutting only at sentence boundaries.
+
+    Audio parts are cut at arbitrary points of the speech, so the transcripts
+    are joined first; sentences are then packed greedily into chunks. Only a
+    single sentence longer than the budget is broken between words.
+    """
+    text = " ".join(transcript.strip() for transcript in transcripts if transcript.strip())
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = []
+    length = -1
+    for sentence in _split_sentences(text, max_tokens):
+        if current and length + 1 + len(sentence) > max_chars:
+            chunks.append(" ".join(current))
+            current, length = [], -1
+        current.append(sentence)
+        length += 1 + len(sentence)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _correct_one(index: int, transcript: str) -> str:
+    """Corrects a single chunk, turning unexpected errors into an empty result."""
+    try:
+        return llm_service.correct_text_chunk(transcript)
+    except Exception as e:
+        log.error(f"[bold red]Unexpected error correcting chunk {index + 1}:[/bold red] {e}")
+        return ""
+
+
+def iter_corrected(
+    transcripts: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_chunk_done: Optional[Callable[[int, str], None]] = None,
+) -> Iterator[str]:
+    """
+    Starts correcting every transcript on a bounded thread pool and returns an
+    iterator over the results in the original order.
+
+    All corrections are submitted immediately; iterating only waits for the
+    next chunk in order, so a consumer can start working on the first chunks
+    while later ones are still being corrected. Failed chunks are yielded as
+    empty strings. `on_chunk_done` is invoked from the worker threads with the
+    index and corrected text of each chunk as soon as it finishes.
+    """
+    workers = max(1, min(concurrency, len(transcripts) or 1))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="correct")
+    futures = []
+    for index, transcript in enumerate(transcripts):
+        future = executor.submit(_correct_one, index, transcript)
+        if on_chunk_done:
+            future.add_done_callback(lambda f, index=index: on_chunk_done(index, f.result()))
+        futures.append(future)
+
+    def results() -> Iterator[str]:
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # If the consumer stops early (e.g. on an error), drop the work that
+            # has not started yet instead of blocking on it. This may run during
+            # garbage collection, so it must never wait for the workers.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    return results()
+
+
+def correct_chunks(
+    transcripts: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_chunk_done: Optional[Callable[[int, str], None]] = None,
+) -> List[str]:
+    """
+    Corrects every transcript with the LLM using a bounded thread pool.
+
+    The returned list keeps the original order of `transcripts`; chunks whose
+    correction failed are returned as empty strings so callers can decide how
+    to handle them.
+    """
+    return list(iter_corrected(transcripts, concurrency, on_chunk_done))
+
+
+def iter_corrected_parts(
+    parts: List[Tuple[str, str]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    manifest: Optional[JobManifest] = None,
+    on_chunk_done: Optional[Callable[[int], None]] = None,
+) -> Iterator[str]:
+    """
+    Phase 1 with checkpoints: yields the corrected `(part_name, transcript)` pairs in order.
+
+    Parts whose transcript is unchanged since the last run are taken from the
+    manifest; the others are corrected concurrently in the background and
+    checkpointed as soon as each one finishes. A part whose correction fails
+    is yielded uncorrected, and is not checkpointed.
+    """
+    hashes = [content_hash(transcript) for _, transcript in parts]
+    checkpoints = [
+        manifest.get_corrected(part_name, hashes[index]) if manifest else None
+        for index, (part_name, _) in enumerate(parts)
+    ]
+    pending = [index for index, checkpoint in enumerate(checkpoints) if checkpoint is None]
+    if manifest and len(pending) < len(parts):
+        log.info(f"Reusing {len(parts) - len(pending)} corrected chunks from the job manifest.")
+
+    def on_pending_done(position: int, text: str):
+        index = pending[position]
+        if manifest and text:
+            manifest.set_corrected(parts[index][0], hashes[index], text)
+            manifest.save()
+        if on_chunk_done:
+            on_chunk_done(index)
+
+    corrections = iter_corrected([parts[index][1] for index in pending], concurrency, on_pending_done)
+    for index, checkpoint in enumerate(checkpoints):
+        if checkpoint is None:
+            corrected = next(corrections)
+            if not corrected:
+                # Keep the content in the document even if it could not be corrected.
+                log.warning(f"Correction of {parts[index][0]} failed; using its uncorrected transcript.")
+            yield corrected or parts[index][1]
+        else:
+            if on_chunk_done:
+                on_chunk_done(index)
+            yield checkpoint
+    # Exhaust the iterator so its thread pool is shut down.
+    for _ in corrections:
+        pass
+
+
+def correct_parts(
+    parts: List[Tuple[str, str]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    manifest: Optional[JobManifest] = None,
+    on_chunk_done: Optional[Callable[[int], None]] = None,
+) -> List[str]:
+    """Runs Phase 1 to completion and returns the corrected parts in order."""
+    return list(iter_corrected_parts(parts, concurrency, manifest, on_chunk_done))
+
+
+def _read_part(path: Path) -> Optional[str]:
+    """Returns the transcript of a part file ("" if it has none), or None if it cannot be parsed yet."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("transcript", "")
+    except (OSError, ValueError):
+        # The file may still be being written.
+        return None
+
+
+def _correct_part(index: int, part_name: str, transcript: str, manifest: Optional[JobManifest]) -> str:
+    """Corrects one part, reusing and saving its manifest checkpoint; falls back to the raw transcript."""
+    input_hash = content_hash(transcript)
+    corrected = manifest.get_corrected(part_name, input_hash) if manifest else None
+    if corrected is not None:
+        return corrected
+    corrected = _correct_one(index, transcript)
+    if not corrected:
+        log.warning(f"Correction of {part_name} failed; using its uncorrected transcript.")
+        return transcript
+    if manifest:
+        manifest.set_corrected(part_name, input_hash, corrected)
+        manifest.save()
+    return corrected
+
+
+def iter_watched_parts(
+    job_dir: Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    manifest: Optional[JobManifest] = None,
+    poll_interval: float = 2.0,
+    idle_timeout: float = 600.0,
+    on_part_found: Optional[Callable[[str], None]] = None,
+    on_part_yielded: Optional[Callable[[str], None]] = None,
+) -> Iterator[str]:
+    """
+    Phase 1 in watch mode: corrects `_part_NNN.json` files as they appear in
+    `job_dir` and yields the corrected parts in part-number order.
+
+    The directory is polled every `poll_interval` seconds, and every new part
+    is submitted for correction as soon as it can be read. A part is yielded
+    once all lower-numbered parts, starting at part 0, have been yielded, so
+    parts that finish transcribing out of order are still structured in
+    order. Watching ends when no new part has appeared for `idle_timeout`
+    seconds; parts still waiting behind a gap in the numbering are then
+    yielded in order. Parts without a transcript are yielded as "".
+    `on_part_yielded`, if given, is called with each part's file name right
+    before its corrected text is yielded.
+    """
+    job_dir = Path(job_dir)
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="correct")
+    seen = set()
+    waiting: Dict[int, Tuple[str, Optional[Future]]] = {}
+    next_index = 0
+    last_found = time.monotonic()
+    try:
+        while True:
+            for path in sorted(job_dir.glob("*_part_*.json")):
+                match = _PART_INDEX.search(path.name)
+                if path.name in seen or not match:
+                    continue
+                transcript = _read_part(path)
+                if transcript is None:
+                    continue
+                seen.add(path.name)
+                last_found = time.monotonic()
+                if on_part_found:
+                    on_part_found(path.name)
+                index = int(match.group(1))
+                future = executor.submit(_correct_part, index, path.name, transcript, manifest) if transcript else None
+                waiting[index] = (path.name, future)
+
+            while next_index in waiting:
+                part_name, future = waiting.pop(next_index)
+                next_index += 1
+                corrected = future.result() if future else ""
+                if on_part_yielded:
+                    on_part_yielded(part_name)
+                yield corrected
+
+            if time.monotonic() - last_found >= idle_timeout:
+                break
+            time.sleep(poll_interval)
+
+        if waiting:
+            log.warning(f"Parts {sorted(waiting)} came after a gap in the part numbering; appending them in order.")
+        for index in sorted(waiting):
+            part_name, future = waiting[index]
+            corrected = future.result() if future else ""
+            if on_part_yielded:
+                on_part_yielded(part_name)
+            yield corrected
+    finally:
+        for _, future in waiting.values():
+            if future:
+                future.cancel()
+        executor.shutdown(wait=False)
+
+
+class DocumentBuilder:
+    """
+    Assembles the final document by streaming sections to an open text file.
+
+    Only the last `context_words` words are kept in memory, in a bounded
+    deque, to serve as context for the next join, so assembly is linear in the
+    size of the document and its memory use does not depend on it.
+    `on_write`, if given, is called with the number of characters written so
+    far every time the output grows.
+    """
+
+    def __init__(self, output: TextIO, context_words: int, on_write: Optional[Callable[[int], None]] = None):
+        self.output = output
+        self.sections_written = 0
+        self.chars_written = 0
+        self.on_write = on_write
+        self._tail = deque(maxlen=context_words)
+
+    def _write(self, text: str):
+        self.output.write(text)
+        self.output.flush()
+        self.chars_written += len(text)
+        if self.on_write:
+            self.on_write(self.chars_written)
+
+    def _section_done(self, section: str):
+        self.sections_written += 1
+        if self._tail.maxlen:
+            self._tail.extend(section.split())
+
+    def append(self, section: str):
+        """Writes a section to the output and updates the rolling context."""
+        self._write(f"\n\n{section}" if self.sections_written else section)
+        self._section_done(section)
+
+    def stream_section(self) -> "SectionStream":
+        """Starts a section whose text is written as it arrives; finish it with `commit`."""
+        return SectionStream(self)
+
+    def commit(self, stream: "SectionStream", section: str):
+        """
+        Completes a streamed section whose final text is `section`.
+
+        If what was streamed differs from `section`, e.g. because the request
+        failed and `section` is a fallback, the streamed text is replaced.
+        """
+        if stream.text != section:
+            stream.reset()
+            self.append(section)
+        else:
+            self._section_done(section)
+
+    def context(self) -> str:
+        """Returns the last `context_words` words written so far."""
+        return " ".join(self._tail)
+
+
+class SectionStream:
+    """
+    Writes one section of a `DocumentBuilder` piece by piece, as an LLM generates it.
+
+    The text is stripped like the final response: leading whitespace is
+    dropped and trailing whitespace is held back until more text follows.
+    `reset` truncates the output back to where the section started, so a
+    retried or failed request leaves nothing behind.
+    """
+
+    def __init__(self, document: DocumentBuilder):
+        self.document = document
+        self.text = ""
+        self._start = document.output.tell()
+        self._chars_before = document.chars_written
+        self._pending = ""
+
+    def write(self, text: str):
+        text = self._pending + (text if self.text else text.lstrip())
+        stripped = text.rstrip()
+        self._pending = text[len(stripped):]
+        if not stripped:
+            return
+        separator = "\n\n" if not self.text and self.document.sections_written else ""
+        self.document._write(separator + stripped)
+        self.text += stripped
+
+    def reset(self):
+        if self.text:
+            self.document.output.seek(self._start)
+            self.document.output.truncate()
+            self.document.chars_written = self._chars_before
+        self.text = ""
+        self._pending = ""
+
+
+def structure_chunks(
+    chunks: Iterable[str],
+    document: DocumentBuilder,
+    manifest: Optional[JobManifest] = None,
+    on_chunk_done: Optional[Callable[[int], None]] = None,
+    stream: bool = False,
+) -> int:
+    """
+    Phase 2: structures the corrected chunks into Markdown sections, in order,
+    appending each one to `document` as soon as it is produced.
+    With `stream`, each section is written to `document` while the LLM is
+    still generating it.
+
+    `chunks` may be a lazy iterator such as `iter_corrected_parts`, in which
+    case each chunk is structured as soon as it becomes available; empty chunks
+    are skipped, and a chunk whose structuring fails is appended as plain
+    text. The first chunk is structured on its own; every following
+    chunk is joined using the rolling context of `document` as context.
+    Each step is checkpointed in the manifest, keyed by its exact inputs, so a
+    re-run only recomputes the steps whose chunk or preceding context changed.
+    Returns the number of chunks structured.
+    """
+    reused = 0
+    steps = 0
+    for index, chunk in enumerate(chunk for chunk in chunks if chunk):
+        steps += 1
+        if index == 0:
+            context = None
+            step_hash = content_hash("initial", chunk)
+        else:
+            context = document.context()
+            step_hash = content_hash("join", context, chunk)
+
+        section = manifest.get_structured(index, step_hash) if manifest else None
+        section_stream = None
+        if section is not None:
+            reused += 1
+        else:
+            # Only pass `stream` when streaming, so the LLM functions are called as before otherwise.
+            options = {}
+            if stream:
+                section_stream = options["stream"] = document.stream_section()
+            if context is None:
+                section = llm_service.structure_initial_chunk(chunk, **options)
+            else:
+                section = llm_service.structure_and_join_chunk(previous_context=context, new_chunk=chunk, **options)
+            if manifest and section:
+                manifest.set_structured(index, step_hash, section)
+                manifest.save()
+
+        if not section:
+            log.warning(f"Structuring of chunk {index + 1} failed; keeping its text unstructured.")
+            section = chunk
+        if section_stream:
+            document.commit(section_stream, section)
+        else:
+            document.append(section)
+        if on_chunk_done:
+            on_chunk_done(index)
+
+    if manifest:
+        manifest.truncate_structured(steps)
+    if reused:
+        log.info(f"Reused {reused} structured sections from the job manifest.")
+    return steps
+
+
+def _merge_pair(first: str, second: str) -> str:
+    """Merges two sections, falling back to plain concatenation if the LLM call fails."""
+    merged = llm_service.merge_sections(first_section=first, second_section=second)
+    return merged or f"{first}\n\n{second}"
+
+
+def structure_tree(
+    chunks: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    window: int = 1,
+    max_merge_words: int = DEFAULT_MAX_MERGE_WORDS,
+    on_chunk_done: Optional[Callable[[int], None]] = None,
+) -> List[str]:
+    """
+    Phase 2, hierarchical mode: structures windows of chunks independently and
+    in parallel, then merges adjacent sections in rounds.
+
+    Each window of `window` consecutive chunks is submitted for structuring as
+    soon as its chunks are available. Each merge round pairs up neighbouring
+    sections whose combined length stays under `max_merge_words` and merges all
+    pairs in parallel, so the number of sequential LLM rounds grows with the
+    logarithm of the number of chunks instead of linearly. Merging stops when
+    no neighbouring pair fits; the remaining sections are returned in order.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="structure") as executor:
+        futures = []
+        texts = []
+        batch = []
+
+        def submit_window():
+            index = len(futures)
+            texts.append("\n\n".join(batch))
+            future = executor.submit(llm_service.structure_initial_chunk, texts[-1])
+            if on_chunk_done:
+                future.add_done_callback(lambda f: on_chunk_done(index))
+            futures.append(future)
+            batch.clear()
+
+        for chunk in chunks:
+            if chunk:
+                batch.append(chunk)
+            if len(batch) >= window:
+                submit_window()
+        if batch:
+            submit_window()
+
+        # Windows whose structuring failed are kept as plain text.
+        sections = [future.result() or text for future, text in zip(futures, texts)]
+
+        round_number = 0
+        while len(sections) > 1:
+            groups = []
+            index = 0
+            while index < len(sections):
+                if index + 1 < len(sections) and len(sections[index].split()) + len(sections[index + 1].split()) <= max_merge_words:
+                    groups.append((sections[index], sections[index + 1]))
+                    index += 2
+                else:
+                    groups.append((sections[index],))
+                    index += 1
+            if len(groups) == len(sections):
+                break
+
+            round_number += 1
+            log.info(f"Merge round {round_number}: {len(sections)} sections -> {len(groups)}.")
+            merges = [executor.submit(_merge_pair, *group) if len(group) == 2 else None for group in groups]
+            sections = [merge.result() if merge else group[0] for group, merge in zip(groups, merges)]
+
+    return sections
@@ -0,0 +1,245 @@
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from speech2text.manifest import CHECKPOINT_DIR_NAME, MANIFEST_NAME
+from speech2text.metrics import METRICS_DIR_NAME
+from speech2text.word_timings import WORD_TIMINGS_SUFFIX
+
+INDEX_NAME = "search_index.sqlite3"
+
+# Directories under the jobs tree that never hold transcripts.
+_SKIPPED_DIRS = {METRICS_DIR_NAME, CHECKPOINT_DIR_NAME}
+
+_WORD = re.compile(r"\w+")
+# Combining marks removed by normalization. The tilde of "ñ" is kept, since
+# "año" and "ano" are different words.
+_TILDE = "\u0303"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    job TEXT NOT NULL,
+    part TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    -- Word positions of the term in the file, as an array of unsigned ints.
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_by_file ON postings (file_id);
+"""
+
+
+def normalize(word: str) -> str:
+    """Lower-cases a word and strips its accents, keeping "ñ" (e.g. "Canción" -> "cancion")."""
+    decomposed = unicodedata.normalize("NFD", word.casefold())
+    kept = [
+        char for index, char in enumerate(decomposed)
+        if not unicodedata.combining(char) or (char == _TILDE and index and decomposed[index - 1] == "n")
+    ]
+    return unicodedata.normalize("NFC", "".join(kept))
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into normalized words; a word's index in the list is its position."""
+    return [normalize(match.group()) for match in _WORD.finditer(text)]
+
+
+def _read_transcript(path: Path) -> Optional[str]:
+    """Returns the transcript of a job JSON file, or None if it has none or cannot be read."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    transcript = data.get("transcript") if isinstance(data, dict) else None
+    return transcript if isinstance(transcript, str) else None
+
+
+def _scan(root: Path) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Yields every JSON file under `root` that may hold a transcript, with its stat."""
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name not in _SKIPPED_DIRS and not name.endswith(WORD_TIMINGS_SUFFIX)]
+        for name in filenames:
+            if name.endswith(".json") and name != MANIFEST_NAME:
+                path = Path(directory) / name
+                yield path, path.stat()
+
+
+class Match(NamedTuple):
+    path: str
+    job: str
+    part: str
+    # Position of the first word of the match among the words of the transcript.
+    position: int
+    snippet: str
+
+
+class SearchIndex:
+    """
+    Inverted index of the transcripts under a jobs directory, in a SQLite database.
+
+    Every normalized word maps to the files it appears in and its positions
+    there, so phrase queries only touch the postings of their own words.
+    `update` re-indexes only files that were added or changed since the last
+    run, detected by modification time and size, and drops deleted ones.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def update(self, root: Path, on_file: Optional[Callable[[Path], None]] = None) -> Dict[str, int]:
+        """
+        Brings the index up to date with the transcripts under `root`.
+
+        `on_file`, if given, is called with each file that is (re-)indexed.
+        Returns how many files were added, updated, removed and left unchanged.
+        """
+        root = Path(root)
+        stats = dict.fromkeys(("added", "updated", "removed", "unchanged"), 0)
+        with self._connect() as db:
+            known = {path: (file_id, mtime_ns, size) for file_id, path, mtime_ns, size in db.execute("SELECT id, path, mtime_ns, size FROM files")}
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                for path, stat in _scan(root):
+                    key = path.relative_to(root).as_posix()
+                    previous = known.pop(key, None)
+                    if previous and previous[1:] == (stat.st_mtime_ns, stat.st_size):
+                        stats["unchanged"] += 1
+                        continue
+                    if previous:
+                        self._remove(db, previous[0])
+                    transcript = _read_transcript(path)
+                    if transcript is None:
+                        # Not a transcript (e.g. a failed job); remembered so it is not read again until it changes.
+                        transcript = ""
+                    elif on_file:
+                        on_file(path)
+                    self._add(db, key, path, stat, transcript)
+                    stats["updated" if previous else "added"] += 1
+                for file_id, _, _ in known.values():
+                    self._remove(db, file_id)
+                    stats["removed"] += 1
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return stats
+
+    def _add(self, db: sqlite3.Connection, key: str, path: Path, stat: os.stat_result, transcript: str):
+        # Parts live in a folder per job; single-file jobs sit directly under the root.
+        parent = Path(key).parent
+        job = parent.as_posix() if parent != Path(".") else path.stem
+        cursor = db.execute(
+            "INSERT INTO files (path, job, part, mtime_ns, size) VALUES (?, ?, ?, ?, ?)",
+            (key, job, path.stem, stat.st_mtime_ns, stat.st_size),
+        )
+        positions: Dict[str, array] = {}
+        for position, term in enumerate(tokenize(transcript)):
+            positions.setdefault(term, array("I")).append(position)
+        db.executemany(
+            "INSERT INTO postings (term, file_id, positions) VALUES (?, ?, ?)",
+            ((term, cursor.lastrowid, values.tobytes()) for term, values in positions.items()),
+        )
+
+    def _remove(self, db: sqlite3.Connection, file_id: int):
+        db.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _postings(self, db: sqlite3.Connection, term: str) -> Dict[int, array]:
+        postings = {}
+        for file_id, blob in db.execute("SELECT file_id, positions FROM postings WHERE term = ?", (term,)):
+            positions = array("I")
+            positions.frombytes(blob)
+            postings[file_id] = positions
+        return postings
+
+    def search(self, query: str, root: Path, limit: int = 20, context_words: int = 8) -> List[Match]:
+        """
+        Finds the phrase `query` in the indexed transcripts, ignoring case, accents and punctuation.
+
+        Returns up to `limit` matches, ordered by file and position, each with
+        a snippet of the original text read from the file under `root`.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._connect() as db:
+            # Start from the rarest word, so the candidate set is as small as possible.
+            postings = {term: self._postings(db, term) for term in set(terms)}
+            rarest = min(postings, key=lambda term: len(postings[term]))
+            candidates = set(postings[rarest])
+            for term_postings in postings.values():
+                candidates.intersection_update(term_postings)
+
+            hits = []
+            for file_id in candidates:
+                offsets = [set(postings[term][file_id]) for term in terms]
+                starts = sorted(
+                    start for start in offsets[0]
+                    if all(start + i in offsets[i] for i in range(1, len(terms)))
+                )
+                hits.extend((file_id, start) for start in starts)
+            if not hits:
+                return []
+            files = {
+                file_id: (path, job, part)
+                for file_id, path, job, part in db.execute(
+                    f"SELECT id, path, job, part FROM files WHERE id IN ({', '.join('?' * len(candidates))})",
+                    list(candidates),
+                )
+            }
+
+        hits.sort(key=lambda hit: (files[hit[0]][0], hit[1]))
+        matches = []
+        for file_id, start in hits[:limit]:
+            path, job, part = files[file_id]
+            snippet = _snippet(Path(root) / path, start, len(terms), context_words)
+            matches.append(Match(path, job, part, start, snippet))
+        return matches
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of indexed files and distinct words."""
+        with self._connect() as db:
+            files = db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            terms = db.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+        return {"files": files, "terms": terms}
+
+
+def _snippet(path: Path, start: int, length: int, context_words: int) -> str:
+    """Returns the original text around the words [start, start + length) of a transcript."""
+    transcript = _read_transcript(path) or ""
+    words = list(_WORD.finditer(transcript))
+    if start >= len(words):
+        # The file changed after it was indexed.
+        return ""
+    first = max(0, start - context_words)
+    end = start + length + context_words
+    # Keep the punctuation that follows the last word.
+    text = transcript[words[first].start():words[end].start() if end < len(words) else len(transcript)]
+    prefix = "..." if first > 0 else ""
+    suffix = "..." if end < len(words) else ""
+    return prefix + " ".join(text.split()) + suffix
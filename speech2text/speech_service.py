@@ -1,38 +1,191 @@
-from google.cloud import speech, storage
-from google.longrunning.operations_pb2 import GetOperationRequest, Operation
+import base64
+import os
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, Tuple
+
+from speech2text import clients, metrics
 from speech2text.logger_setup import log
 
+if TYPE_CHECKING:
+    from google.api_core.operation import Operation
+
+# Files at least this large are uploaded as parallel chunks (XML multipart upload).
+# Each chunk is retried on its own, but the multipart upload is not kept across
+# calls: if it fails, the next attempt sends the whole file again.
+PARALLEL_UPLOAD_THRESHOLD = 64 * 1024 * 1024
+PARALLEL_UPLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+PARALLEL_UPLOAD_WORKERS = 8
+# Chunk size of single-stream resumable uploads; must be a multiple of 256 KiB.
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+
+def _encode_crc32c(checksum: int) -> str:
+    """Formats a CRC32C value the way GCS reports it for blobs (base64, big-endian)."""
+    return base64.b64encode(checksum.to_bytes(4, "big")).decode("ascii")
+
+def compute_crc32c(local_file_path: str) -> str:
+    """Computes the base64-encoded CRC32C of a file, in the format GCS reports for blobs."""
+    import google_crc32c
+
+    checksum = google_crc32c.Checksum()
+    with open(local_file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            checksum.update(block)
+    return _encode_crc32c(int.from_bytes(checksum.digest(), "big"))
+
+def _is_up_to_date(bucket, destination_blob_name: str, crc32c: str) -> bool:
+    """Checks whether the destination blob already exists with the given checksum."""
+    existing = bucket.get_blob(destination_blob_name)
+    return existing is not None and existing.crc32c == crc32c
+
 def upload_to_gcs(local_file_path: str, bucket_name: str, destination_blob_name: str):
-    """Uploads a file to the GCS bucket and returns its GCS URI."""
+    """
+    Uploads a file to the GCS bucket and returns its GCS URI.
+
+    The upload is skipped if a blob with the same CRC32C already exists at the
+    destination. Files below `PARALLEL_UPLOAD_THRESHOLD` use a chunked
+    resumable upload, so a dropped connection only retries one chunk. Larger
+    files are uploaded as parallel chunks, which is faster but not resumable:
+    a chunk that keeps failing fails the upload, and a retry starts over.
+    """
     try:
-        storage_client = storage.Client()
+        storage_client = clients.get_storage_client()
         bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(destination_blob_name)
+        gcs_uri = f"gs://{bucket_name}/{destination_blob_name}"
+
+        with metrics.span("gcs.checksum"):
+            up_to_date = _is_up_to_date(bucket, destination_blob_name, compute_crc32c(local_file_path))
+        if up_to_date:
+            log.info(f"[bold green]{gcs_uri} is already up to date, skipping upload.[/bold green]")
+            metrics.increment("gcs.uploads_skipped")
+            return gcs_uri
 
-        log.info(f"[bold blue]Uploading {local_file_path} to gs://{bucket_name}/{destination_blob_name}[/bold blue]")
-        blob.upload_from_filename(local_file_path)
+        log.info(f"[bold blue]Uploading {local_file_path} to {gcs_uri}[/bold blue]")
+        size = os.path.getsize(local_file_path)
+        with metrics.span("gcs.upload"):
+            if size >= PARALLEL_UPLOAD_THRESHOLD:
+                from google.cloud.storage import transfer_manager
+
+                transfer_manager.upload_chunks_concurrently(
+                    local_file_path,
+                    bucket.blob(destination_blob_name),
+                    chunk_size=PARALLEL_UPLOAD_CHUNK_SIZE,
+                    max_workers=PARALLEL_UPLOAD_WORKERS,
+                    worker_type=transfer_manager.THREAD,
+                )
+            else:
+                blob = bucket.blob(destination_blob_name, chunk_size=RESUMABLE_CHUNK_SIZE)
+                blob.upload_from_filename(local_file_path)
+        metrics.observe("gcs.upload_bytes", size)
+        log.info(f"[bold green]Upload complete. URI: {gcs_uri}[/bold green]")
+        return gcs_uri
+    except Exception as e:
+        log.error(f"[bold red]GCS upload failed:[/bold red] {e}")
+        metrics.increment("gcs.upload_errors")
+        return None
+
+def upload_bytes_to_gcs(data: bytes, bucket_name: str, destination_blob_name: str, content_type: str):
+    """Uploads in-memory data to the GCS bucket and returns its GCS URI, skipping identical blobs."""
+    import google_crc32c
+
+    try:
+        storage_client = clients.get_storage_client()
+        bucket = storage_client.bucket(bucket_name)
         gcs_uri = f"gs://{bucket_name}/{destination_blob_name}"
+
+        with metrics.span("gcs.checksum"):
+            up_to_date = _is_up_to_date(bucket, destination_blob_name, _encode_crc32c(google_crc32c.value(data)))
+        if up_to_date:
+            log.info(f"[bold green]{gcs_uri} is already up to date, skipping upload.[/bold green]")
+            metrics.increment("gcs.uploads_skipped")
+            return gcs_uri
+
+        log.info(f"[bold blue]Uploading {len(data)} bytes to {gcs_uri}[/bold blue]")
+        with metrics.span("gcs.upload"):
+            blob = bucket.blob(destination_blob_name, chunk_size=RESUMABLE_CHUNK_SIZE)
+            blob.upload_from_string(data, content_type=content_type)
+        metrics.observe("gcs.upload_bytes", len(data))
         log.info(f"[bold green]Upload complete. URI: {gcs_uri}[/bold green]")
         return gcs_uri
     except Exception as e:
         log.error(f"[bold red]GCS upload failed:[/bold red] {e}")
+        metrics.increment("gcs.upload_errors")
         return None
 
 def start_transcription_job(gcs_uri: str, config: dict):
     """Initiates a long-running speech recognition job from a GCS URI."""
+    from google.cloud import speech
+
     log.info(f"[bold blue]Starting transcription for:[/bold blue] {gcs_uri}")
-    client = speech.SpeechClient()
+    client = clients.get_speech_client()
 
     audio = speech.RecognitionAudio(uri=gcs_uri)
     recognition_config = speech.RecognitionConfig(**config)
 
     try:
-        operation: Operation = client.long_running_recognize(
-            config=recognition_config, audio=audio
-        )
+        with metrics.span("speech.submit"):
+            operation = client.long_running_recognize(
+                config=recognition_config, audio=audio
+            )
         log.info("[bold green]API call successful. Operation started.[/bold green]")
         return operation
     except Exception as e:
         log.error(f"[bold red]API call failed:[/bold red] {e}")
+        metrics.increment("speech.submit_errors")
         return None
 
+def check_operation(operation_name: str) -> Tuple[bool, object, Exception]:
+    """
+    Looks up a recognition operation by name, e.g. one started by another process.
+
+    Returns `(done, result, error)`; `result` and `error` are None while the
+    operation is still running.
+    """
+    from google.cloud import speech
+
+    client = clients.get_speech_client()
+    with metrics.span("speech.check"):
+        operation = client.transport.operations_client.get_operation(operation_name)
+    if not operation.done:
+        return False, None, None
+    if operation.HasField("error"):
+        return True, None, RuntimeError(f"Operation failed with code {operation.error.code}: {operation.error.message}")
+    return True, speech.LongRunningRecognizeResponse.deserialize(operation.response.value), None
+
+def extract_transcript(result) -> str:
+    """Joins the top alternative of every result in a recognition response."""
+    return "\n".join(res.alternatives[0].transcript for res in result.results if res.alternatives).strip()
+
+def poll_operations(operations: Dict[str, "Operation"], poll_interval: float, timeout: float) -> Iterator[Tuple[str, object, Exception]]:
+    """
+    Polls several long-running operations together.
+
+    Yields `(key, result, error)` as soon as each operation finishes; exactly one
+    of `result` and `error` is set. Operations still running after `timeout`
+    seconds are yielded with a TimeoutError.
+    """
+    pending = dict(operations)
+    started = time.monotonic()
+    deadline = started + timeout
+    while pending:
+        for key, operation in list(pending.items()):
+            try:
+                if not operation.done():
+                    continue
+                result, error = operation.result(), None
+            except Exception as e:
+                result, error = None, e
+                metrics.increment("speech.recognition_errors")
+            del pending[key]
+            # Time from the start of polling until the result was seen, so it
+            # includes up to one `poll_interval` of polling delay.
+            metrics.record("speech.recognition_wait", time.monotonic() - started)
+            yield key, result, error
+
+        if not pending:
+            break
+        if time.monotonic() >= deadline:
+            for key in pending:
+                metrics.increment("speech.recognition_timeouts")
+                yield key, None, TimeoutError(f"Operation did not complete within {timeout} seconds.")
+            break
+        time.sleep(poll_interval)
@@ -0,0 +1,126 @@
+import itertools
+import json
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from speech2text.logger_setup import log
+from speech2text.manifest import MANIFEST_NAME
+
+DEFAULT_WORKERS = 8
+# Parts read ahead of the writer, per worker; bounds memory however many parts a job has.
+READ_AHEAD_PER_WORKER = 4
+# Shorter repeats at a part boundary are kept, since a word repeated once ("que que") is usually real speech.
+MIN_OVERLAP_WORDS = 2
+
+_DIGITS = re.compile(r"(\d+)")
+_NON_WORD = re.compile(r"\W+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class MergeStats(NamedTuple):
+    parts: int
+    skipped: int
+    words_removed: int
+
+
+def natural_key(name: str) -> Tuple:
+    """Sort key that orders embedded numbers by value, so "part_10" comes after "part_9"."""
+    return tuple(int(piece) if piece.isdigit() else piece.casefold() for piece in _DIGITS.split(name))
+
+
+def find_parts(job_dir: Path) -> List[Path]:
+    """Returns the JSON files of a job directory in natural order."""
+    paths = [path for path in Path(job_dir).glob("*.json") if path.name != MANIFEST_NAME]
+    return sorted(paths, key=lambda path: natural_key(path.name))
+
+
+def _read_transcript(path: Path) -> Optional[str]:
+    """Returns the transcript of a part file, or None if it has none or cannot be read."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning(f"Could not read or parse {path}: {e}")
+        return None
+    transcript = data.get("transcript") if isinstance(data, dict) else None
+    return transcript if isinstance(transcript, str) and transcript else None
+
+
+def iter_transcripts(paths: Iterable[Path], workers: int = DEFAULT_WORKERS) -> Iterator[Tuple[Path, Optional[str]]]:
+    """
+    Reads and parses part files in parallel, yielding `(path, transcript)` in input order.
+
+    Only a bounded number of parts are read ahead, so memory use does not
+    grow with the number of parts.
+    """
+    paths = iter(paths)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="merge") as executor:
+        pending = deque(
+            (path, executor.submit(_read_transcript, path))
+            for path in itertools.islice(paths, workers * READ_AHEAD_PER_WORKER)
+        )
+        while pending:
+            path, future = pending.popleft()
+            for next_path in itertools.islice(paths, 1):
+                pending.append((next_path, executor.submit(_read_transcript, next_path)))
+            yield path, future.result()
+
+
+def _comparable(word: str) -> str:
+    return _NON_WORD.sub("", word.casefold())
+
+
+def overlap_length(previous: List[str], following: List[str], max_words: int) -> int:
+    """
+    Returns how many leading words of `following` repeat the last words of `previous`.
+
+    Words are compared ignoring case and punctuation. The longest overlap of
+    at least `MIN_OVERLAP_WORDS` and at most `max_words` words wins; 0 if none.
+    """
+    previous = [_comparable(word) for word in previous[-max_words:]]
+    following = [_comparable(word) for word in following[:max_words]]
+    for length in range(min(len(previous), len(following)), MIN_OVERLAP_WORDS - 1, -1):
+        if previous[-length:] == following[:length]:
+            return length
+    return 0
+
+
+def _drop_words(text: str, count: int) -> str:
+    """Removes the first `count` words of `text`, keeping the rest of it untouched."""
+    pieces = _WHITESPACE.split(text.lstrip(), maxsplit=count)
+    return pieces[count] if len(pieces) > count else ""
+
+
+def merge_parts(paths: Iterable[Path], output: TextIO, workers: int = DEFAULT_WORKERS, dedup_overlap: int = 0) -> MergeStats:
+    """
+    Writes the transcripts of the given part files to `output`, one per line, in order.
+
+    Parts are parsed in parallel and written as soon as their turn comes, so
+    the whole job is never held in memory. With `dedup_overlap`, up to that
+    many words at the start of a part that repeat the end of the previous
+    part, as happens when the audio was split with overlap, are removed.
+    """
+    parts = skipped = removed = 0
+    tail: List[str] = []
+    for path, transcript in iter_transcripts(paths, workers):
+        if transcript is None:
+            skipped += 1
+            continue
+        if dedup_overlap and tail:
+            overlap = overlap_length(tail, transcript.split(None, dedup_overlap)[:dedup_overlap], dedup_overlap)
+            if overlap:
+                log.debug(f"Removed {overlap} repeated words at the start of {path.name}.")
+                transcript = _drop_words(transcript, overlap)
+                removed += overlap
+        if not transcript.strip():
+            continue
+        if parts:
+            output.write("\n")
+        output.write(transcript)
+        parts += 1
+        if dedup_overlap:
+            tail = transcript.rsplit(None, dedup_overlap)[-dedup_overlap:]
+    return MergeStats(parts, skipped, removed)
@@ -0,0 +1,122 @@
+import bisect
+import io
+import mmap
+import wave
+from typing import List, NamedTuple
+
+import numpy as np
+
+from speech2text.audio_splitter import SAMPLE_DTYPES, frame_energy, read_wav_info
+
+# Analysis frame for the voice-activity decision.
+FRAME_SECONDS = 0.03
+# A frame is speech if it is this many dB above the estimated noise floor.
+THRESHOLD_DB = 12.0
+# Frames quieter than this absolute level (dBFS) are never speech.
+MIN_SPEECH_DBFS = -55.0
+# Only pauses longer than this are shortened; shorter ones are kept as they are.
+MIN_SILENCE_SECONDS = 1.0
+# Silence kept around each speech region, so words are not clipped or glued together.
+PADDING_SECONDS = 0.25
+
+
+class TrimResult(NamedTuple):
+    wav_data: bytes
+    # Rows of [trimmed_start, original_start, duration], in seconds.
+    offset_map: List[List[float]]
+    original_seconds: float
+    trimmed_seconds: float
+
+    @property
+    def trimmed_ratio(self) -> float:
+        """Fraction of the original audio that was removed."""
+        if not self.original_seconds:
+            return 0.0
+        return 1.0 - self.trimmed_seconds / self.original_seconds
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """Returns the [start, end) indices of every run of True values in `mask`."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)), axis=1)
+
+
+def speech_mask(energy: np.ndarray, full_scale: float) -> np.ndarray:
+    """
+    Classifies analysis frames as speech (True) or silence (False).
+
+    The noise floor is estimated as the 10th percentile of the frame energies,
+    so the threshold adapts to the recording level. Pauses shorter than
+    `MIN_SILENCE_SECONDS` are treated as speech, and every speech region is
+    widened by `PADDING_SECONDS` on both sides.
+    """
+    if not len(energy):
+        return np.zeros(0, dtype=bool)
+    level_db = 10.0 * np.log10(np.maximum(energy, 1e-10) / (full_scale ** 2))
+    noise_floor = np.percentile(level_db, 10)
+    mask = (level_db > noise_floor + THRESHOLD_DB) & (level_db > MIN_SPEECH_DBFS)
+
+    padding = int(round(PADDING_SECONDS / FRAME_SECONDS))
+    if padding:
+        kernel = np.ones(2 * padding + 1)
+        mask = np.convolve(mask, kernel, mode="same") > 0
+
+    min_silence = int(round(MIN_SILENCE_SECONDS / FRAME_SECONDS))
+    for start, end in _runs(~mask):
+        # Keep short pauses, but never pad the start or end of the file.
+        if end - start < min_silence and start > 0 and end < len(mask):
+            mask[start:end] = True
+    return mask
+
+
+def trim_silence(wav_path: str) -> TrimResult:
+    """
+    Removes long silences from a PCM WAV file.
+
+    Returns the trimmed audio as WAV bytes together with an offset map that
+    translates times in the trimmed audio back to the original timeline.
+    """
+    info = read_wav_info(wav_path)
+    frame_length = max(1, int(info.sample_rate * FRAME_SECONDS))
+    full_scale = float(2 ** (8 * info.sample_width - 1))
+    frame_bytes = info.channels * info.sample_width
+
+    with open(wav_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        samples = np.frombuffer(
+            mm,
+            dtype=SAMPLE_DTYPES[info.sample_width],
+            count=info.num_frames * info.channels,
+            offset=info.data_offset,
+        )
+        mask = speech_mask(frame_energy(samples, info.channels, frame_length), full_scale)
+        del samples
+
+        regions = _runs(mask) * frame_length
+        if len(regions):
+            # The last partial analysis frame belongs to the final region if it reaches the end.
+            if regions[-1, 1] == len(mask) * frame_length:
+                regions[-1, 1] = info.num_frames
+
+        buffer = io.BytesIO()
+        offset_map = []
+        kept = 0
+        with wave.open(buffer, "wb") as out:
+            out.setnchannels(info.channels)
+            out.setsampwidth(info.sample_width)
+            out.setframerate(info.sample_rate)
+            for start, end in regions:
+                begin = info.data_offset + int(start) * frame_bytes
+                out.writeframesraw(mm[begin: begin + int(end - start) * frame_bytes])
+                offset_map.append([kept / info.sample_rate, start / info.sample_rate, (end - start) / info.sample_rate])
+                kept += int(end - start)
+
+    return TrimResult(buffer.getvalue(), offset_map, info.num_frames / info.sample_rate, kept / info.sample_rate)
+
+
+def to_original_time(seconds: float, offset_map: List[List[float]]) -> float:
+    """Maps a time in the trimmed audio back to the original recording."""
+    if not offset_map:
+        return seconds
+    index = max(0, bisect.bisect_right([row[0] for row in offset_map], seconds) - 1)
+    trimmed_start, original_start, _ = offset_map[index]
+    return original_start + (seconds - trimmed_start)
@@ -0,0 +1,160 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+# Word timings of a job are stored in this directory next to its JSON file,
+# e.g. `lecture_part_000.words/` for `lecture_part_000.json`.
+WORD_TIMINGS_SUFFIX = ".words"
+FORMAT_VERSION = 1
+
+# One uncompressed .npy file per column, so each can be memory-mapped on its own.
+COLUMNS = {
+    "start_ms": np.uint32,
+    "end_ms": np.uint32,
+    "confidence": np.float32,
+    # Speaker tag from diarization; 0 when unknown.
+    "speaker": np.uint16,
+    # Index into `vocabulary`.
+    "word_id": np.uint32,
+}
+VOCABULARY_FILE = "vocabulary.json"
+META_FILE = "meta.json"
+
+
+class WordTimings(NamedTuple):
+    """
+    Word-level recognition results as parallel arrays, one entry per word.
+
+    Times are in milliseconds on the original audio timeline. Words are
+    stored as ids into `vocabulary`, so repeated words cost four bytes each.
+    """
+    start_ms: np.ndarray
+    end_ms: np.ndarray
+    confidence: np.ndarray
+    speaker: np.ndarray
+    word_id: np.ndarray
+    vocabulary: List[str]
+
+    @property
+    def num_words(self) -> int:
+        return len(self.word_id)
+
+    def words(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """Returns the words with indices in [start, end) as strings."""
+        return [self.vocabulary[i] for i in self.word_id[start:end].tolist()]
+
+    def index_at(self, seconds: float) -> int:
+        """Returns the index of the word being spoken at `seconds`, or of the last word started before it (-1 if none)."""
+        return int(np.searchsorted(self.start_ms, seconds * 1000, side="right")) - 1
+
+    def between(self, start_seconds: float, end_seconds: float) -> slice:
+        """Returns the slice of words starting within [start_seconds, end_seconds)."""
+        start = int(np.searchsorted(self.start_ms, start_seconds * 1000, side="left"))
+        end = int(np.searchsorted(self.start_ms, end_seconds * 1000, side="left"))
+        return slice(start, end)
+
+
+def _milliseconds(duration) -> int:
+    """Converts a recognition time offset (a timedelta) to whole milliseconds."""
+    return int(round(duration.total_seconds() * 1000)) if duration is not None else 0
+
+
+def from_result(result) -> WordTimings:
+    """
+    Extracts the words of the top alternative of every result in a recognition response.
+
+    The words only carry times if the request enabled `enable_word_time_offsets`.
+    With speaker diarization, the last result repeats every word of the
+    response with its speaker tag, so only that result is used.
+    """
+    results = [res for res in result.results if res.alternatives]
+    if results and any(getattr(word, "speaker_tag", 0) for word in results[-1].alternatives[0].words):
+        results = results[-1:]
+
+    vocabulary = {}
+    rows = []
+    for res in results:
+        for word in res.alternatives[0].words:
+            word_id = vocabulary.setdefault(word.word, len(vocabulary))
+            rows.append((
+                _milliseconds(word.start_time),
+                _milliseconds(word.end_time),
+                getattr(word, "confidence", 0.0) or 0.0,
+                getattr(word, "speaker_tag", 0) or 0,
+                word_id,
+            ))
+
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    arrays = [np.array(values, dtype=dtype) for values, dtype in zip(columns, COLUMNS.values())]
+    return WordTimings(*arrays, list(vocabulary))
+
+
+def to_original_timeline(timings: WordTimings, offset_map: List[List[float]]) -> WordTimings:
+    """
+    Shifts times measured on silence-trimmed audio back to the original recording.
+
+    `offset_map` has the rows of [trimmed_start, original_start, duration], in
+    seconds, produced by `vad.trim_silence`; see `vad.to_original_time`.
+    """
+    if not offset_map or not timings.num_words:
+        return timings
+    table = np.array(offset_map, dtype=np.float64)
+    trimmed_starts_ms = table[:, 0] * 1000
+    shifts_ms = (table[:, 1] - table[:, 0]) * 1000
+
+    def remap(times: np.ndarray) -> np.ndarray:
+        rows = np.maximum(np.searchsorted(trimmed_starts_ms, times, side="right") - 1, 0)
+        return np.round(times + shifts_ms[rows]).astype(np.uint32)
+
+    return timings._replace(start_ms=remap(timings.start_ms), end_ms=remap(timings.end_ms))
+
+
+def timings_path(job_file: Path) -> Path:
+    """Returns the word timings directory that belongs to a job JSON file."""
+    job_file = Path(job_file)
+    return job_file.with_name(job_file.stem + WORD_TIMINGS_SUFFIX)
+
+
+def save(timings: WordTimings, path: Path):
+    """
+    Writes the timings to the directory `path`, replacing any previous contents.
+
+    The files are written to a temporary directory first, so readers never
+    see a half-written store.
+    """
+    path = Path(path)
+    staging = path.with_name(path.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    for name in COLUMNS:
+        np.save(staging / f"{name}.npy", getattr(timings, name), allow_pickle=False)
+    with open(staging / VOCABULARY_FILE, "w", encoding="utf-8") as f:
+        json.dump(timings.vocabulary, f, ensure_ascii=False)
+    with open(staging / META_FILE, "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "words": timings.num_words}, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(staging, path)
+
+
+def load(path: Path, mmap: bool = True) -> WordTimings:
+    """
+    Loads word timings saved with `save`.
+
+    With `mmap` (the default) the columns are memory-mapped read-only, so
+    opening a store is cheap however long the recording, and only the pages
+    actually read, e.g. by a time lookup, are loaded from disk.
+    """
+    path = Path(path)
+    with open(path / META_FILE, encoding="utf-8") as f:
+        version = json.load(f).get("version")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported word timings format version {version} in {path}.")
+    mode = "r" if mmap else None
+    arrays = [np.load(path / f"{name}.npy", mmap_mode=mode, allow_pickle=False) for name in COLUMNS]
+    with open(path / VOCABULARY_FILE, encoding="utf-8") as f:
+        vocabulary = json.load(f)
+    return WordTimings(*arrays, vocabulary)
@@ -0,0 +1,9 @@
+import pytest
+from speech2text import clients
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    """Ensures every test builds its own (possibly mocked) API clients."""
+    clients.clear()
+    yield
+    clients.clear()
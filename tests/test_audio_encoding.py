@@ -0,0 +1,24 @@
+import io
+import wave
+import numpy as np
+import pytest
+soundfile = pytest.importorskip("soundfile")
+from speech2text import audio_encoding
+
+def test_encode_flac_is_lossless(tmp_path, monkeypatch):
+    """Test that encoding in blocks round-trips every sample and shrinks the file."""
+    monkeypatch.setattr(audio_encoding, "BLOCK_FRAMES", 1000)
+    samples = (np.sin(np.arange(48000) / 20.0) * 8000).astype(np.int16)
+    path = tmp_path / "audio.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(samples.tobytes())
+
+    data, sample_rate = audio_encoding.encode_flac(str(path))
+
+    assert sample_rate == 16000
+    assert len(data) < path.stat().st_size
+    decoded, _ = soundfile.read(io.BytesIO(data), dtype="int16")
+    np.testing.assert_array_equal(decoded, samples)
@@ -0,0 +1,125 @@
+import struct
+import wave
+import numpy as np
+import pytest
+from click.testing import CliRunner
+from speech2text import audio_splitter
+from speech2text.cli import cli
+
+SAMPLE_RATE = 16000
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(samples.astype(np.int16).tobytes())
+
+def make_speech_with_gaps(seconds, gaps):
+    """Generates a noisy signal with silent stretches at the given (start, end) seconds."""
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-8000, 8000, size=int(seconds * SAMPLE_RATE))
+    for start, end in gaps:
+        samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0
+    return samples
+
+def test_read_wav_info(tmp_path):
+    """Test that the header parser finds the format and data chunk."""
+    path = tmp_path / "audio.wav"
+    write_wav(path, np.zeros(SAMPLE_RATE * 2))
+
+    info = audio_splitter.read_wav_info(str(path))
+
+    assert info.channels == 1
+    assert info.sample_width == 2
+    assert info.sample_rate == SAMPLE_RATE
+    assert info.num_frames == SAMPLE_RATE * 2
+    assert info.data_offset == 44
+
+def test_split_wav_cuts_at_silence(tmp_path):
+    """Test that cuts land inside the silent gaps and that no samples are lost."""
+    samples = make_speech_with_gaps(30, gaps=[(11.0, 12.0), (21.5, 22.5)])
+    path = tmp_path / "audio.wav"
+    write_wav(path, samples)
+
+    parts = audio_splitter.split_wav(str(path), str(tmp_path), segment_seconds=10, search_seconds=3)
+
+    assert [p.name for p in parts] == ["audio_part_000.wav", "audio_part_001.wav", "audio_part_002.wav"]
+    joined = []
+    for part in parts:
+        with wave.open(str(part), "rb") as w:
+            joined.append(np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16))
+    np.testing.assert_array_equal(np.concatenate(joined), samples.astype(np.int16))
+
+    first_cut = len(joined[0]) / SAMPLE_RATE
+    second_cut = first_cut + len(joined[1]) / SAMPLE_RATE
+    assert 11.0 <= first_cut <= 12.0
+    assert 21.5 <= second_cut <= 22.5
+
+def test_split_command_rejects_non_wav(tmp_path, caplog):
+    """Test that the split command reports an error for files that are not PCM WAV."""
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"not a wav file at all")
+
+    result = CliRunner().invoke(cli, ["split", str(path), "--split-time", "00:00:10"])
+
+    assert result.exit_code == 0
+    assert "Could not split" in caplog.text
+
+def test_split_command_rejects_truncated_wav(tmp_path, caplog):
+    """Test that an empty or truncated file is reported as an error instead of raising."""
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"RIFF")
+
+    result = CliRunner().invoke(cli, ["split", str(path)])
+
+    assert result.exit_code == 0
+    assert result.exception is None
+    assert "Could not split" in caplog.text
+
+def write_extensible_wav(path, subformat_code, bits, samples):
+    """Writes a mono WAVE_FORMAT_EXTENSIBLE file whose SubFormat GUID starts with `subformat_code`."""
+    block_align = bits // 8
+    subformat = struct.pack("<H", subformat_code) + audio_splitter.KSDATAFORMAT_SUBTYPE_PCM[2:]
+    fmt = struct.pack("<HHIIHHHHI", 0xFFFE, 1, SAMPLE_RATE, SAMPLE_RATE * block_align, block_align, bits, 22, bits, 4) + subformat
+    data = samples.tobytes()
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+def test_read_wav_info_checks_extensible_subformat(tmp_path):
+    """Test that WAVE_FORMAT_EXTENSIBLE files are accepted only when their SubFormat is PCM."""
+    pcm = tmp_path / "pcm.wav"
+    write_extensible_wav(pcm, 1, 16, np.zeros(SAMPLE_RATE, dtype=np.int16))
+    float_path = tmp_path / "float.wav"
+    write_extensible_wav(float_path, 3, 32, np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    assert audio_splitter.read_wav_info(str(pcm))[:3] == (1, 2, SAMPLE_RATE)
+    with pytest.raises(ValueError, match="PCM"):
+        audio_splitter.read_wav_info(str(float_path))
+
+@pytest.mark.parametrize("channels, sample_width, sample_rate", [(2, 2, 44100), (1, 2, 8000), (1, 4, SAMPLE_RATE), (1, 1, SAMPLE_RATE)])
+def test_split_command_rejects_stereo_or_other_sample_rates(tmp_path, caplog, channels, sample_width, sample_rate):
+    """Test that audio transcription would reject (not 16 kHz, 16-bit mono) is refused before any part is written."""
+    path = tmp_path / "audio.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(sample_width)
+        w.setframerate(sample_rate)
+        w.writeframes(bytes(sample_rate * 2 * channels * sample_width))
+
+    result = CliRunner().invoke(cli, ["split", str(path), "--split-time", "1"])
+
+    assert result.exit_code == 0
+    assert "expects 16000 Hz 16-bit mono" in caplog.text
+    assert list(tmp_path.glob("*_part_*.wav")) == []
+
+def test_split_command_rejects_extensible_float_wav(tmp_path, caplog):
+    """Test that IEEE-float samples in a WAVE_FORMAT_EXTENSIBLE file are not split as integers."""
+    path = tmp_path / "audio.wav"
+    write_extensible_wav(path, 3, 32, np.zeros(SAMPLE_RATE * 2, dtype=np.float32))
+
+    result = CliRunner().invoke(cli, ["split", str(path), "--split-time", "1"])
+
+    assert result.exit_code == 0
+    assert "must be 8, 16 or 32-bit PCM" in caplog.text
+    assert list(tmp_path.glob("*_part_*.wav")) == []
@@ -0,0 +1,23 @@
+import json
+from benchmarks import run
+
+def test_benchmark_reports_every_scenario(tmp_path):
+    """Test that the offline benchmark runs both commands against the fakes and reports their metrics."""
+    output = tmp_path / "results.json"
+
+    results = run.main([
+        "--parts", "3", "--concurrency", "1", "2",
+        "--latency", "0", "--upload-latency", "0", "--recognition-latency", "0",
+        "--output", str(output),
+    ])
+
+    assert [(r["command"], r["concurrency"]) for r in results] == [
+        ("post-process", 1), ("transcribe-dir", 1), ("post-process", 2), ("transcribe-dir", 2),
+    ]
+    for result in results:
+        assert result["parts"] == 3
+        assert result["wall_seconds"] > 0
+        assert result["peak_memory_mb"] is not None
+    assert all(r["llm_calls"] == 6 and r["output_bytes"] > 0 for r in results if r["command"] == "post-process")
+    assert all(r["speech_calls"] == 6 for r in results if r["command"] == "transcribe-dir")
+    assert json.loads(output.read_text()) == results
@@ -2,6 +2,7 @@
 
 import json
 import pytest
+from pathlib import Path
 from click.testing import CliRunner
 from speech2text.cli import cli
 
@@ -68,3 +69,93 @@ def test_post_process_default_output_name(mock_llm_service, job_dir):
     # The default output should be in the parent directory of job_dir, named after job_dir
     assert "test_job.md" in result.output
 
+def test_transcribe_dir_submits_all_and_saves_results(mocker, tmp_path):
+    """Test that every file is uploaded and submitted, and each result is saved to its job file."""
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    for i in range(3):
+        (audio_dir / f"rec_part_{i:03d}.wav").write_bytes(b"")
+    jobs_dir = tmp_path / "jobs"
+
+    mocker.patch('speech2text.cli.GCS_BUCKET_NAME', 'bucket')
+    mocker.patch('speech2text.cli.speech_service.upload_to_gcs', side_effect=lambda local_file_path, bucket_name, destination_blob_name: f"gs://{bucket_name}/{destination_blob_name}")
+    start = mocker.patch('speech2text.cli.speech_service.start_transcription_job', side_effect=lambda gcs_uri, config: mocker.MagicMock(**{'operation.name': f"op-{gcs_uri}"}))
+    mocker.patch('speech2text.cli.speech_service.poll_operations', side_effect=lambda operations, poll_interval, timeout: ((key, object(), None) for key in operations))
+    mocker.patch('speech2text.cli.speech_service.extract_transcript', return_value="texto")
+
+    result = CliRunner().invoke(cli, ["transcribe-dir", str(audio_dir), "--output-dir", str(jobs_dir)])
+
+    assert result.exit_code == 0
+    assert start.call_count == 3
+    for i in range(3):
+        with open(jobs_dir / f"rec_part_{i:03d}.json") as f:
+            data = json.load(f)
+        assert data["status"] == "DONE"
+        assert data["transcript"] == "texto"
+        assert data["gcs_uri"] == f"gs://bucket/rec_part_{i:03d}.wav"
+
+def make_jobs(root, parts_per_job):
+    for name, parts in parts_per_job:
+        job = root / name
+        job.mkdir()
+        for i in range(parts):
+            with open(job / f"{name}_part_{i:03d}.json", "w") as f:
+                json.dump({"transcript": f"parte {i} " * 20}, f)
+
+def test_post_process_many_runs_largest_jobs_first_and_writes_summary(mocker, tmp_path):
+    """Test that jobs are processed largest first, non-job folders are skipped and every outcome lands in the summary."""
+    make_jobs(tmp_path, [("small", 1), ("large", 3), ("broken", 2), ("metrics", 0), ("small_part_000.words", 0)])
+    processed = []
+    mocker.patch('speech2text.cli._post_process_job', side_effect=lambda job_dir, output_path, show_progress, **options: processed.append(job_dir.name) or job_dir.name != "broken")
+    summary_path = tmp_path / "summary.json"
+
+    result = CliRunner().invoke(cli, ["post-process-many", str(tmp_path / "*"), "--processes", "1", "--summary", str(summary_path)])
+
+    assert result.exit_code == 0
+    assert processed == ["large", "broken", "small"]
+    with open(summary_path) as f:
+        summary = json.load(f)
+    assert (summary["jobs"], summary["failed"]) == (3, 1)
+    assert {Path(r["job"]).name: r["status"] for r in summary["results"]} == {"broken": "ERROR", "large": "DONE", "small": "DONE"}
+
+def test_post_process_many_process_pool(monkeypatch, tmp_path):
+    """Test the multi-process path end to end: spawned workers sharing the scheduler write every document."""
+    # Without an API key the LLM calls fail at once, so each job falls back to its raw text.
+    monkeypatch.setenv("GEMINI_API_KEY", "")
+    jobs = tmp_path / "jobs"
+    jobs.mkdir()
+    make_jobs(jobs, [("a", 1), ("b", 2), ("c", 1)])
+    summary_path = tmp_path / "summary.json"
+
+    result = CliRunner().invoke(cli, [
+        "post-process-many", str(jobs / "*"), "--processes", "2", "--no-cache", "--max-retries", "0",
+        "--output-dir", str(tmp_path / "docs"), "--summary", str(summary_path),
+    ])
+
+    assert result.exit_code == 0
+    with open(summary_path) as f:
+        summary = json.load(f)
+    assert (summary["jobs"], summary["failed"], summary["processes"]) == (3, 0, 2)
+    for name in ["a", "b", "c"]:
+        assert "parte 0" in (tmp_path / "docs" / f"{name}.md").read_text(encoding="utf-8")
+
+def test_post_process_watch_prunes_checkpoints_of_removed_parts(mocker, tmp_path):
+    """Test that watch mode drops manifest entries and checkpoint files of parts that no longer exist."""
+    from speech2text.manifest import JobManifest
+    mocker.patch('speech2text.post_processing.llm_service.correct_text_chunk', side_effect=lambda text: text.upper())
+    mocker.patch('speech2text.post_processing.llm_service.structure_initial_chunk', side_effect=lambda chunk: f"## {chunk}")
+    job = tmp_path / "job"
+    job.mkdir()
+    stale = JobManifest.load(job)
+    stale.set_corrected("job_part_001.json", "old-hash", "ANTIGUA")
+    stale.save()
+    with open(job / "job_part_000.json", "w") as f:
+        json.dump({"transcript": "parte cero"}, f)
+
+    result = CliRunner().invoke(cli, ["post-process", str(job), "--watch", "--watch-interval", "0.01", "--watch-idle", "0.1", "--no-cache"])
+
+    assert result.exit_code == 0
+    manifest = JobManifest.load(job)
+    assert list(manifest.corrected) == ["job_part_000.json"]
+    assert manifest.get_corrected("job_part_000.json", manifest.corrected["job_part_000.json"]) == "PARTE CERO"
+    assert len(list(manifest.checkpoint_dir.iterdir())) == 2  # The corrected part and its structured section.
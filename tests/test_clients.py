@@ -0,0 +1,30 @@
+import threading
+from unittest.mock import patch
+from speech2text import clients
+
+def test_clients_are_created_once():
+    """Test that repeated lookups return the same client instance."""
+    with patch('google.cloud.storage.Client', side_effect=object) as factory:
+        first = clients.get_storage_client()
+        second = clients.get_storage_client()
+
+    assert first is second
+    factory.assert_called_once()
+
+def test_clients_are_created_once_across_threads():
+    """Test that concurrent first lookups from a thread pool share one client."""
+    barrier = threading.Barrier(8)
+    results = []
+    def lookup():
+        barrier.wait()
+        results.append(clients.get_generative_model("model", "fake-api-key"))
+
+    with patch('google.generativeai.GenerativeModel', side_effect=lambda name: object()) as factory:
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len({id(result) for result in results}) == 1
+    factory.assert_called_once_with("model")
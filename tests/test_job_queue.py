@@ -0,0 +1,90 @@
+import json
+import time
+from click.testing import CliRunner
+from speech2text.cli import cli
+from speech2text.job_queue import JobQueue, PENDING, RUNNING, DONE, FAILED
+
+def test_enqueue_skips_queued_files_and_requeues_failed_ones(tmp_path):
+    """Test that a file is queued only once, unless its previous job failed."""
+    queue = JobQueue(tmp_path / "queue.sqlite3")
+
+    assert queue.enqueue("/audio/a.wav", "a", "/jobs", {"flac": True})
+    assert not queue.enqueue("/audio/a.wav", "a", "/jobs")
+
+    job = queue.claim(PENDING, "w1", lease_seconds=60)
+    queue.update(job["id"], state=FAILED, error="boom")
+    assert queue.enqueue("/audio/a.wav", "a", "/jobs")
+
+    [job] = queue.jobs()
+    assert job["state"] == PENDING
+    assert job["error"] is None
+    assert job["options"] == {}
+
+def test_claims_are_exclusive_until_the_lease_expires(tmp_path):
+    """Test that a claimed job is invisible to other workers until it is released or its lease runs out."""
+    queue = JobQueue(tmp_path / "queue.sqlite3")
+    queue.enqueue("/audio/a.wav", "a", "/jobs")
+
+    job = queue.claim(PENDING, "w1", lease_seconds=0.2)
+    assert job["claimed_by"] == "w1"
+    assert queue.claim(PENDING, "w2", lease_seconds=60) is None
+
+    time.sleep(0.25)
+    job = queue.claim(PENDING, "w2", lease_seconds=60)
+    assert job["claimed_by"] == "w2"
+
+    queue.update(job["id"], state=RUNNING, details={"trimmed_ratio": 0.1}, not_before=time.time() + 60)
+    assert queue.claim(RUNNING, "w3", lease_seconds=60) is None
+    assert queue.claim(RUNNING, "w3", lease_seconds=60, due_only=False)["details"] == {"trimmed_ratio": 0.1}
+    assert queue.counts() == {PENDING: 0, RUNNING: 1, DONE: 0, FAILED: 0}
+
+def test_submit_and_worker_process_the_queue(mocker, tmp_path):
+    """Test that a worker uploads, submits and collects every queued file, then exits."""
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    paths = []
+    for i in range(3):
+        path = audio_dir / f"rec_part_{i:03d}.wav"
+        path.write_bytes(b"")
+        paths.append(str(path))
+    queue_path = str(tmp_path / "queue.sqlite3")
+    jobs_dir = tmp_path / "jobs"
+
+    mocker.patch('speech2text.cli.GCS_BUCKET_NAME', 'bucket')
+    mocker.patch('speech2text.cli.speech_service.upload_to_gcs', side_effect=lambda local_file_path, bucket_name, destination_blob_name: f"gs://{bucket_name}/{destination_blob_name}")
+    mocker.patch('speech2text.cli.speech_service.start_transcription_job', side_effect=lambda gcs_uri, config: mocker.MagicMock(**{'operation.name': f"op-{gcs_uri}"}))
+    checks = mocker.patch('speech2text.cli.speech_service.check_operation', side_effect=[(False, None, None)] + [(True, object(), None)] * 3)
+    mocker.patch('speech2text.cli.speech_service.extract_transcript', return_value="texto")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["submit", *paths, "--queue", queue_path, "--output-dir", str(jobs_dir)])
+    assert result.exit_code == 0
+    result = runner.invoke(cli, ["worker", "--queue", queue_path, "--threads", "2", "--poll-interval", "0.01"])
+    assert result.exit_code == 0, result.output
+
+    assert checks.call_count == 4
+    assert JobQueue(queue_path).counts()[DONE] == 3
+    for i in range(3):
+        with open(jobs_dir / f"rec_part_{i:03d}.json") as f:
+            data = json.load(f)
+        assert data["transcript"] == "texto"
+        assert data["operation_name"] == f"op-gs://bucket/rec_part_{i:03d}.wav"
+
+def test_worker_fails_jobs_whose_status_check_keeps_raising(mocker, tmp_path):
+    """Test that failed status checks count as attempts, so the job fails and the worker exits."""
+    queue_path = str(tmp_path / "queue.sqlite3")
+    queue = JobQueue(queue_path)
+    queue.enqueue(str(tmp_path / "rec.wav"), "rec", str(tmp_path / "jobs"), {})
+    job = queue.claim(PENDING, "w1", lease_seconds=60)
+    queue.update(job["id"], state=RUNNING, attempts=1, operation_name="op-expired", not_before=0)
+
+    mocker.patch('speech2text.cli.GCS_BUCKET_NAME', 'bucket')
+    checks = mocker.patch('speech2text.cli.speech_service.check_operation', side_effect=RuntimeError("operation not found"))
+
+    result = CliRunner().invoke(cli, ["worker", "--queue", queue_path, "--poll-interval", "0.01", "--max-attempts", "3"])
+
+    assert result.exit_code == 0, result.output
+    assert checks.call_count == 2
+    [failed] = queue.jobs([FAILED])
+    assert failed["attempts"] == 3
+    assert "operation not found" in failed["error"]
@@ -0,0 +1,73 @@
+import os
+import time
+from unittest.mock import MagicMock, patch
+from speech2text import llm_service
+from speech2text.llm_cache import ResponseCache, make_key
+
+def test_cache_hit_and_miss(tmp_path):
+    """Test that stored responses are returned and counted as hits."""
+    cache = ResponseCache(str(tmp_path))
+    key = make_key("model", "template {x}", x="value")
+
+    assert cache.get(key) is None
+    cache.put(key, "response")
+    assert cache.get(key) == "response"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_cache_key_depends_on_inputs():
+    """Test that different models, templates or inputs produce different keys."""
+    base = make_key("model", "template", x="a")
+    assert base == make_key("model", "template", x="a")
+    assert base != make_key("other-model", "template", x="a")
+    assert base != make_key("model", "other-template", x="a")
+    assert base != make_key("model", "template", x="b")
+
+def test_cache_expires_old_entries(tmp_path):
+    """Test that entries older than the maximum age are treated as misses."""
+    cache = ResponseCache(str(tmp_path), max_age_seconds=60)
+    key = make_key("model", "template")
+    cache.put(key, "response")
+    old = time.time() - 120
+    os.utime(cache._path_for(key), (old, old))
+
+    assert cache.get(key) is None
+    assert not cache._path_for(key).exists()
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the oldest entries are evicted once the size budget is exceeded."""
+    cache = ResponseCache(str(tmp_path), max_bytes=200)
+    keys = [make_key("model", "template", i=i) for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.put(key, "x" * 60)
+        stamp = time.time() - 100 + i
+        os.utime(cache._path_for(key), (stamp, stamp))
+
+    assert cache.stats()["bytes"] <= 200
+    assert cache.get(keys[-1]) is not None
+    assert cache.get(keys[0]) is None
+
+def test_cache_size_counts_rewritten_entries_once(tmp_path):
+    """Test that writing an existing key again replaces its size instead of adding to it."""
+    cache = ResponseCache(str(tmp_path))
+    key = make_key("model", "template")
+    cache.put(key, "x" * 60)
+    cache.put(key, "x" * 60)
+    cache.put(key, "x" * 10)
+
+    assert cache.stats()["bytes"] == cache._path_for(key).stat().st_size
+
+@patch('speech2text.llm_service.GEMINI_API_KEY', 'fake-api-key')
+def test_llm_service_uses_cache(tmp_path):
+    """Test that a repeated prompt is served from the cache without calling the model."""
+    mock_model = MagicMock()
+    mock_model.generate_content.return_value.text = "corrected"
+    llm_service.configure_cache(str(tmp_path))
+    try:
+        with patch('google.generativeai.GenerativeModel', return_value=mock_model):
+            assert llm_service.correct_text_chunk("same text") == "corrected"
+            assert llm_service.correct_text_chunk("same text") == "corrected"
+    finally:
+        llm_service.configure_cache(None)
+
+    mock_model.generate_content.assert_called_once()
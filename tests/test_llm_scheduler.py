@@ -0,0 +1,100 @@
+import multiprocessing
+import threading
+import time
+import pytest
+from speech2text import metrics
+from speech2text.llm_scheduler import RequestScheduler, TokenBucket, is_retryable
+
+class ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+def test_is_retryable():
+    """Test that rate limits, timeouts and server errors are retryable and client errors are not."""
+    assert is_retryable(ApiError(429))
+    assert is_retryable(ApiError(503))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(ApiError(400))
+    assert not is_retryable(ValueError("bad prompt"))
+
+def test_token_bucket_paces_requests():
+    """Test that the bucket allows a burst up to its capacity and then waits for the refill."""
+    bucket = TokenBucket(per_minute=600)  # 10 tokens per second
+
+    start = time.monotonic()
+    assert bucket.acquire(600) == 0
+    waited = bucket.acquire(2)
+
+    assert waited == pytest.approx(0.2, abs=0.05)
+    assert time.monotonic() - start >= 0.19
+
+def test_scheduler_retries_transient_errors():
+    """Test that retryable errors are retried until the request succeeds."""
+    scheduler = RequestScheduler(6000, 10 ** 6, max_in_flight=2, max_retries=3, base_delay=0)
+    responses = [ApiError(429), ApiError(503), "ok"]
+    current = metrics.reset()
+
+    def request():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert scheduler.call(request, estimated_tokens=10) == "ok"
+    assert current.counters["llm.retries"] == 2
+
+def test_scheduler_gives_up_on_permanent_errors():
+    """Test that non-retryable errors, and retryable ones past the retry limit, are raised."""
+    scheduler = RequestScheduler(6000, 10 ** 6, max_in_flight=2, max_retries=2, base_delay=0)
+    calls = []
+
+    def failing(error):
+        def request():
+            calls.append(error)
+            raise error
+        return request
+
+    with pytest.raises(ApiError):
+        scheduler.call(failing(ApiError(400)), estimated_tokens=10)
+    assert len(calls) == 1
+
+    with pytest.raises(ApiError):
+        scheduler.call(failing(ApiError(429)), estimated_tokens=10)
+    assert len(calls) == 1 + 3
+
+def test_scheduler_limits_requests_in_flight():
+    """Test that no more than `max_in_flight` requests run at the same time."""
+    scheduler = RequestScheduler(6000, 10 ** 6, max_in_flight=3, max_retries=0)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def request():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    threads = [threading.Thread(target=scheduler.call, args=(request, 10)) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 3
+
+def test_shared_token_bucket_spans_processes():
+    """Test that tokens taken by another process come out of the same shared bucket."""
+    context = multiprocessing.get_context("spawn")
+    bucket = TokenBucket(per_minute=60, context=context)  # 1 token per second
+
+    process = context.Process(target=bucket.acquire, args=(50,))
+    process.start()
+    process.join(timeout=30)
+
+    assert process.exitcode == 0
+    assert bucket.acquire(10) == 0
+    assert bucket.acquire(5) > 1
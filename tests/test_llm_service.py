@@ -68,3 +68,31 @@ def test_structure_and_join_chunk_success(mock_generative_model):
     assert "new chunk" in mock_model.generate_content.call_args[0][0]
     assert result == "## New Section\n\nMore content."
 
+
+@patch('speech2text.llm_service.GEMINI_API_KEY', 'fake-api-key')
+def test_merge_sections_success(mock_generative_model):
+    """Test successful merging of two adjacent sections."""
+    mock_model, mock_response = mock_generative_model
+    mock_response.text = "## Merged\n\nAll content."
+
+    result = llm_service.merge_sections("## First\n\nA", "## Second\n\nB")
+
+    mock_model.generate_content.assert_called_once()
+    assert "## First" in mock_model.generate_content.call_args[0][0]
+    assert "## Second" in mock_model.generate_content.call_args[0][0]
+    assert result == "## Merged\n\nAll content."
+
+@patch('speech2text.llm_service.GEMINI_API_KEY', 'fake-api-key')
+def test_structure_initial_chunk_streams_response(mock_generative_model):
+    """Test that a streamed response is passed on piece by piece and its full text is returned."""
+    mock_model, mock_response = mock_generative_model
+    mock_response.__iter__.return_value = [MagicMock(text="## Title"), MagicMock(text="\n\nBody")]
+    mock_response.text = "## Title\n\nBody"
+    stream = MagicMock()
+
+    result = llm_service.structure_initial_chunk("chunk", stream=stream)
+
+    assert result == "## Title\n\nBody"
+    assert mock_model.generate_content.call_args[1] == {"stream": True}
+    stream.reset.assert_called_once()
+    assert [c[0][0] for c in stream.write.call_args_list] == ["## Title", "\n\nBody"]
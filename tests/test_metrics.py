@@ -0,0 +1,50 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from speech2text import llm_service, metrics
+
+def test_summary_reports_stage_statistics(tmp_path):
+    """Test that timings, counters and observed values are summarized and written as JSON."""
+    m = metrics.Metrics()
+    for seconds in [0.005, 0.02, 0.02, 0.3, 2.0]:
+        m.record("llm.correct", seconds)
+    with m.span("post_process.read_parts"):
+        pass
+    m.increment("llm.correct.errors")
+    m.increment("llm.correct.errors")
+    m.observe("llm.prompt_tokens", 100)
+    m.observe("llm.prompt_tokens", 300)
+
+    path = tmp_path / "metrics" / "job.json"
+    m.write(path)
+    summary = json.loads(path.read_text())
+
+    stage = summary["stages"]["llm.correct"]
+    assert stage["count"] == 5
+    assert stage["total_seconds"] == pytest.approx(2.345)
+    assert stage["p50_seconds"] == pytest.approx(0.02)
+    assert stage["max_seconds"] == pytest.approx(2.0)
+    assert stage["histogram"] == {"<=10ms": 1, "<=25ms": 2, "<=500ms": 1, "<=2500ms": 1}
+    assert summary["stages"]["post_process.read_parts"]["count"] == 1
+    assert summary["counters"] == {"llm.correct.errors": 2}
+    assert summary["values"]["llm.prompt_tokens"] == {"count": 2, "total": 400, "mean": 200.0, "max": 300}
+
+@patch('speech2text.llm_service.GEMINI_API_KEY', 'fake-api-key')
+def test_llm_calls_are_instrumented():
+    """Test that each Gemini call records its latency, token usage and failures."""
+    model = MagicMock()
+    response = MagicMock(text="ok")
+    response.usage_metadata.prompt_token_count = 120
+    response.usage_metadata.candidates_token_count = 30
+    model.generate_content.side_effect = [response, Exception("API Error")]
+    current = metrics.reset()
+
+    with patch('google.generativeai.GenerativeModel', return_value=model):
+        assert llm_service.correct_text_chunk("hola") == "ok"
+        assert llm_service.correct_text_chunk("adiós") == ""
+
+    summary = current.summary()
+    assert summary["stages"]["llm.correct"]["count"] == 2
+    assert summary["counters"] == {"llm.correct.calls": 2, "llm.correct.errors": 1}
+    assert summary["values"]["llm.prompt_tokens"]["total"] == 120
+    assert summary["values"]["llm.response_tokens"]["total"] == 30
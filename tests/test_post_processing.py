@@ -0,0 +1,208 @@
+import io
+import json
+import time
+import random
+import threading
+from speech2text import post_processing
+from speech2text.llm_scheduler import estimate_tokens
+from speech2text.manifest import JobManifest, content_hash
+
+def test_correct_chunks_preserves_order(mocker):
+    """Test that corrected chunks come back in input order even when they finish out of order."""
+    def slow_correct(text):
+        time.sleep(random.uniform(0, 0.02))
+        return f"corrected: {text}"
+    mocker.patch('speech2text.post_processing.llm_service.correct_text_chunk', side_effect=slow_correct)
+
+    transcripts = [f"part {i}" for i in range(20)]
+    result = post_processing.correct_chunks(transcripts, concurrency=8)
+
+    assert result == [f"corrected: part {i}" for i in range(20)]
+
+def test_correct_chunks_isolates_failures(mocker):
+    """Test that a failing chunk yields an empty string without affecting the others."""
+    def flaky_correct(text):
+        if text == "bad":
+            raise RuntimeError("boom")
+        return text.upper()
+    mocker.patch('speech2text.post_processing.llm_service.correct_text_chunk', side_effect=flaky_correct)
+
+    done = []
+    result = post_processing.correct_chunks(["a", "bad", "c"], concurrency=2, on_chunk_done=lambda index, text: done.append(index))
+
+    assert result == ["A", "", "C"]
+    assert sorted(done) == [0, 1, 2]
+
+def test_correct_parts_reuses_manifest_checkpoints(mocker, tmp_path):
+    """Test that only parts whose transcript changed are corrected again."""
+    correct = mocker.patch('speech2text.post_processing.llm_service.correct_text_chunk', side_effect=lambda text: f"corrected: {text}")
+    parts = [("job_part_000.json", "one"), ("job_part_001.json", "two")]
+
+    manifest = JobManifest.load(tmp_path)
+    post_processing.correct_parts(parts, manifest=manifest)
+    assert correct.call_count == 2
+
+    manifest = JobManifest.load(tmp_path)
+    result = post_processing.correct_parts([parts[0], ("job_part_001.json", "changed")], manifest=manifest)
+
+    assert result == ["corrected: one", "corrected: changed"]
+    assert correct.call_count == 3
+    correct.assert_called_with("changed")
+
+def test_structure_chunks_recomputes_downstream_of_change(mocker, tmp_path):
+    """Test that a changed chunk invalidates its own step and the steps that depend on its output."""
+    initial = mocker.patch('speech2text.post_processing.llm_service.structure_initial_chunk', side_effect=lambda chunk: f"## {chunk}")
+    join = mocker.patch('speech2text.post_processing.llm_service.structure_and_join_chunk', side_effect=lambda previous_context, new_chunk: f"## {new_chunk}")
+
+    output = io.StringIO()
+    manifest = JobManifest.load(tmp_path)
+    post_processing.structure_chunks(["a", "b", "c", "d"], post_processing.DocumentBuilder(output, 1), manifest=manifest)
+    assert output.getvalue() == "## a\n\n## b\n\n## c\n\n## d"
+    assert join.call_count == 3
+
+    # Changing "b" changes its output, which is the context of "c"; "d" only sees "c"'s output.
+    output = io.StringIO()
+    manifest = JobManifest.load(tmp_path)
+    post_processing.structure_chunks(["a", "B", "c", "d"], post_processing.DocumentBuilder(output, 1), manifest=manifest)
+
+    assert output.getvalue() == "## a\n\n## B\n\n## c\n\n## d"
+    assert initial.call_count == 1
+    assert [call.kwargs["new_chunk"] for call in join.call_args_list[3:]] == ["B", "c"]
+
+def test_structuring_starts_before_correction_finishes(mocker):
+    """Test that the first chunk is structured while later chunks are still being corrected."""
+    release_last = threading.Event()
+    def correct(text):
+        if text == "last":
+            assert release_last.wait(timeout=5), "structuring did not start before the last correction"
+        return text
+    mocker.patch('speech2text.post_processing.llm_service.correct_text_chunk', side_effect=correct)
+    def initial(chunk):
+        release_last.set()
+        return f"## {chunk}"
+    mocker.patch('speech2text.post_processing.llm_service.structure_initial_chunk', side_effect=initial)
+    mocker.patch('speech2text.post_processing.llm_service.structure_and_join_chunk', side_effect=lambda previous_context, new_chunk: f"## {new_chunk}")
+
+    parts = [("p0", "first"), ("p1", "middle"), ("p2", "last")]
+    chunks = post_processing.iter_corrected_parts(parts, concurrency=3)
+    output = io.StringIO()
+    post_processing.structure_chunks(chunks, post_processing.DocumentBuilder(output, 10))
+
+    assert output.getvalue() == "## first\n\n## middle\n\n## last"
+
+def test_structure_tree_merges_in_log_rounds(mocker):
+    """Test that tree mode structures windows independently and merges neighbours pairwise."""
+    mocker.patch('speech2text.post_processing.llm_service.structure_initial_chunk', side_effect=lambda chunk: chunk.replace("\n\n", "+"))
+    merge = mocker.patch('speech2text.post_processing.llm_service.merge_sections', side_effect=lambda first_section, second_section: f"{first_section} {second_section}")
+
+    sections = post_processing.structure_tree([f"c{i}" for i in range(8)], concurrency=4, window=2)
+
+    assert sections == ["c0+c1 c2+c3 c4+c5 c6+c7"]
+    # 4 windows -> 2 -> 1 takes two rounds and three merges.
+    assert merge.call_count == 3
+
+def test_structure_tree_respects_merge_word_limit(mocker):
+    """Test that sections are not merged past the word limit and stay in order."""
+    mocker.patch('speech2text.post_processing.llm_service.structure_initial_chunk', side_effect=lambda chunk: chunk)
+    mocker.patch('speech2text.post_processing.llm_service.merge_sections', side_effect=lambda first_section, second_section: f"{first_section} {second_section}")
+
+    chunks = ["one two three", "four", "five", "six seven eight"]
+    sections = post_processing.structure_tree(chunks, concurrency=2, max_merge_words=4)
+
+    assert sections == ["one two three four", "five six seven eight"]
+
+def test_document_builder_keeps_rolling_context():
+    """Test that the builder streams sections and only keeps the last words as context."""
+    output = io.StringIO()
+    document = post_processing.DocumentBuilder(output, context_words=3)
+
+    document.append("## One\n\nuno dos")
+    document.append("## Two\n\ntres cuatro")
+
+    assert output.getvalue() == "## One\n\nuno dos\n\n## Two\n\ntres cuatro"
+    assert document.context() == "Two tres cuatro"
+    assert document.sections_written == 2
+
+def test_streamed_sections_are_written_progressively_and_rolled_back_on_failure(mocker):
+    """Test that streamed sections reach the output as they arrive and failed ones are replaced by their chunk."""
+    output = io.StringIO()
+    document = post_processing.DocumentBuilder(output, context_words=10)
+    seen = []
+
+    def structure_initial_chunk(chunk, stream):
+        for piece in ["\n## Uno", "\n\n", "texto "]:
+            stream.write(piece)
+            seen.append(output.getvalue())
+        return "## Uno\n\ntexto"
+
+    def structure_and_join_chunk(previous_context, new_chunk, stream):
+        stream.write("## Dos a medias")
+        return ""
+
+    mocker.patch('speech2text.post_processing.llm_service.structure_initial_chunk', side_effect=structure_initial_chunk)
+    mocker.patch('speech2text.post_processing.llm_service.structure_and_join_chunk', side_effect=structure_and_join_chunk)
+
+    post_processing.structure_chunks(["uno", "dos"], document, stream=True)
+
+    assert seen == ["## Uno", "## Uno", "## Uno\n\ntexto"]
+    assert output.getvalue() == "## Uno\n\ntexto\n\ndos"
+    assert document.sections_written == 2
+    assert document.chars_written == len(output.getvalue())
+    assert document.context() == "## Uno texto dos"
+
+def test_rechunk_packs_sentences_under_budget():
+    """Test that parts are joined and re-split at sentence boundaries within the token budget."""
+    transcripts = ["Hola a todos. Hoy hablamos de", "redes neuronales. ¿Listos? Empecemos ya.", "", "Fin."]
+
+    chunks = post_processing.rechunk(transcripts, max_tokens=10)
+
+    assert chunks == ["Hola a todos.", "Hoy hablamos de redes neuronales.", "¿Listos? Empecemos ya. Fin."]
+    assert all(estimate_tokens(chunk) <= 10 for chunk in chunks)
+
+def test_rechunk_breaks_overlong_sentences_between_words():
+    """Test that a single sentence longer than the budget is split at word boundaries without losing words."""
+    words = [f"palabra{i}" for i in range(50)]
+
+    chunks = post_processing.rechunk([" ".join(words)], max_tokens=10)
+
+    assert len(chunks) > 1
+    assert " ".join(chunks).split() == words
+    assert all(estimate_tokens(chunk) <= 10 for chunk in chunks)
+
+def test_failed_llm_calls_do_not_drop_content(mocker, tmp_path):
+    """Test that a part whose correction or structuring fails still reaches the document, unprocessed."""
+    mocker.patch('speech2text.post_processing.llm_service.correct_text_chunk', side_effect=lambda text: "" if text == "dos" else text.upper())
+    mocker.patch('speech2text.post_processing.llm_service.structure_initial_chunk', side_effect=lambda chunk: f"## {chunk}")
+    mocker.patch('speech2text.post_processing.llm_service.structure_and_join_chunk', side_effect=lambda previous_context, new_chunk: "" if new_chunk == "TRES" else f"## {new_chunk}")
+    parts = [("job_part_000.json", "uno"), ("job_part_001.json", "dos"), ("job_part_002.json", "tres")]
+    manifest = JobManifest.load(tmp_path)
+
+    output = io.StringIO()
+    corrected = post_processing.iter_corrected_parts(parts, manifest=manifest)
+    post_processing.structure_chunks(corrected, post_processing.DocumentBuilder(output, 10), manifest=manifest)
+
+    assert output.getvalue() == "## UNO\n\n## dos\n\nTRES"
+    assert manifest.get_corrected("job_part_001.json", content_hash("dos")) is None
+
+def test_watch_mode_processes_parts_as_they_arrive(mocker, tmp_path):
+    """Test that parts written over time, even out of order, are corrected on arrival and structured in order."""
+    mocker.patch('speech2text.post_processing.llm_service.correct_text_chunk', side_effect=lambda text: text.upper())
+    mocker.patch('speech2text.post_processing.llm_service.structure_initial_chunk', side_effect=lambda chunk: f"## {chunk}")
+    mocker.patch('speech2text.post_processing.llm_service.structure_and_join_chunk', side_effect=lambda previous_context, new_chunk: f"## {new_chunk}")
+
+    def write_parts():
+        for index in [0, 2, 1, 3]:
+            time.sleep(0.05)
+            with open(tmp_path / f"rec_part_{index:03d}.json", "w") as f:
+                json.dump({"transcript": f"parte {index}"}, f)
+
+    writer = threading.Thread(target=write_parts)
+    writer.start()
+    found = []
+    output = io.StringIO()
+    chunks = post_processing.iter_watched_parts(tmp_path, concurrency=2, poll_interval=0.01, idle_timeout=0.3, on_part_found=found.append)
+    post_processing.structure_chunks(chunks, post_processing.DocumentBuilder(output, 10))
+    writer.join()
+
+    assert found == ["rec_part_000.json", "rec_part_002.json", "rec_part_001.json", "rec_part_003.json"]
+    assert output.getvalue() == "## PARTE 0\n\n## PARTE 1\n\n## PARTE 2\n\n## PARTE 3"
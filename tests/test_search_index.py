@@ -0,0 +1,55 @@
+import json
+import os
+from speech2text import search_index
+from speech2text.search_index import SearchIndex
+
+def write_part(path, transcript):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"transcript": transcript}, f)
+
+def test_normalize_strips_accents_but_keeps_enie():
+    """Test that normalization ignores case and accents but keeps "ñ" distinct from "n"."""
+    assert search_index.normalize("Canción") == "cancion"
+    assert search_index.normalize("ÁRBOL") == "arbol"
+    assert search_index.normalize("Año") == "año"
+    assert search_index.tokenize("¿Qué pasó, Begoña?") == ["que", "paso", "begoña"]
+
+def test_phrase_search_maps_matches_to_job_and_part(tmp_path):
+    """Test that phrase queries match consecutive words only and report their job, part and snippet."""
+    jobs = tmp_path / "jobs"
+    write_part(jobs / "mesa_1" / "mesa_1_part_000.json", "Hoy hablamos de redes neuronales.")
+    write_part(jobs / "mesa_1" / "mesa_1_part_001.json", "Las redes, sin embargo, no son neuronales.")
+    write_part(jobs / "charla.json", "Redes Neuronales aplicadas a la educación.")
+    (jobs / "mesa_1" / "metrics").mkdir()
+    write_part(jobs / "mesa_1" / "metrics" / "post_process.json", "redes neuronales")
+    index = SearchIndex(tmp_path / "index.sqlite3")
+
+    stats = index.update(jobs)
+    matches = index.search("redes NEURONALES", jobs)
+
+    assert stats["added"] == 3
+    assert [(m.job, m.part, m.position) for m in matches] == [("charla", "charla", 0), ("mesa_1", "mesa_1_part_000", 3)]
+    assert matches[1].snippet == "Hoy hablamos de redes neuronales."
+    assert [m.part for m in index.search("educacion", jobs)] == ["charla"]
+    assert index.search("neuronales redes", jobs) == []
+
+def test_update_only_reindexes_changed_files(tmp_path):
+    """Test that unchanged files are skipped, changed ones re-indexed and deleted ones dropped."""
+    jobs = tmp_path / "jobs"
+    write_part(jobs / "a" / "a_part_000.json", "uno dos")
+    write_part(jobs / "a" / "a_part_001.json", "tres cuatro")
+    write_part(jobs / "a" / "a_part_002.json", "cinco")
+    index = SearchIndex(tmp_path / "index.sqlite3")
+    index.update(jobs)
+
+    write_part(jobs / "a" / "a_part_000.json", "uno dos y seis")
+    os.utime(jobs / "a" / "a_part_000.json", ns=(0, 10 ** 9))
+    (jobs / "a" / "a_part_002.json").unlink()
+    indexed = []
+    stats = index.update(jobs, on_file=indexed.append)
+
+    assert stats == {"added": 0, "updated": 1, "removed": 1, "unchanged": 1}
+    assert [p.name for p in indexed] == ["a_part_000.json"]
+    assert [m.part for m in index.search("seis", jobs)] == ["a_part_000"]
+    assert index.search("cinco", jobs) == []
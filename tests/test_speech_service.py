@@ -0,0 +1,83 @@
+from unittest.mock import MagicMock
+from speech2text import speech_service
+
+def make_operation(done_after, result=None, error=None):
+    """Creates a fake operation that reports done after `done_after` polls."""
+    operation = MagicMock()
+    polls = {"count": 0}
+    def done():
+        polls["count"] += 1
+        return polls["count"] > done_after
+    operation.done.side_effect = done
+    if error:
+        operation.result.side_effect = error
+    else:
+        operation.result.return_value = result
+    return operation
+
+def test_poll_operations_yields_in_completion_order():
+    """Test that operations are yielded as soon as each one finishes."""
+    operations = {
+        "slow": make_operation(done_after=2, result="slow result"),
+        "fast": make_operation(done_after=0, result="fast result"),
+        "broken": make_operation(done_after=1, error=RuntimeError("failed")),
+    }
+
+    finished = list(speech_service.poll_operations(operations, poll_interval=0, timeout=10))
+
+    assert [key for key, _, _ in finished] == ["fast", "broken", "slow"]
+    assert finished[0][1] == "fast result"
+    assert isinstance(finished[1][2], RuntimeError)
+
+def test_poll_operations_times_out():
+    """Test that unfinished operations are reported with a TimeoutError."""
+    operations = {"stuck": make_operation(done_after=10**6)}
+
+    finished = list(speech_service.poll_operations(operations, poll_interval=0, timeout=0))
+
+    assert finished[0][0] == "stuck"
+    assert isinstance(finished[0][2], TimeoutError)
+
+def test_extract_transcript():
+    """Test that the top alternative of each result is joined by newlines."""
+    result = MagicMock()
+    first, second = MagicMock(), MagicMock()
+    first.alternatives[0].transcript = "hola"
+    second.alternatives[0].transcript = "mundo"
+    result.results = [first, second]
+
+    assert speech_service.extract_transcript(result) == "hola\nmundo"
+
+def test_compute_crc32c_matches_gcs_format(tmp_path):
+    """Test that the checksum is the base64 big-endian CRC32C that GCS reports."""
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"123456789")
+
+    # CRC32C("123456789") is the standard check value 0xE3069283.
+    assert speech_service.compute_crc32c(str(path)) == "4waSgw=="
+
+def test_upload_to_gcs_skips_identical_blob(mocker, tmp_path):
+    """Test that no bytes are uploaded when the blob already has the same checksum."""
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"audio data")
+    bucket = MagicMock()
+    bucket.get_blob.return_value.crc32c = speech_service.compute_crc32c(str(path))
+    mocker.patch('speech2text.speech_service.clients.get_storage_client').return_value.bucket.return_value = bucket
+
+    uri = speech_service.upload_to_gcs(str(path), "bucket", "audio.wav")
+
+    assert uri == "gs://bucket/audio.wav"
+    bucket.blob.assert_not_called()
+
+def test_upload_to_gcs_uploads_changed_blob(mocker, tmp_path):
+    """Test that a blob with a different checksum is uploaded again."""
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"audio data")
+    bucket = MagicMock()
+    bucket.get_blob.return_value.crc32c = "stale"
+    mocker.patch('speech2text.speech_service.clients.get_storage_client').return_value.bucket.return_value = bucket
+
+    uri = speech_service.upload_to_gcs(str(path), "bucket", "audio.wav")
+
+    assert uri == "gs://bucket/audio.wav"
+    bucket.blob.return_value.upload_from_filename.assert_called_once_with(str(path))
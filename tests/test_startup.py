@@ -0,0 +1,28 @@
+import subprocess
+import sys
+import time
+
+# Generous budget for `--help`; a regression that re-introduces eager SDK
+# imports pushes startup well past a second.
+MAX_HELP_SECONDS = 1.0
+HEAVY_MODULES = ["google.cloud.speech", "google.cloud.storage", "google.generativeai", "numpy"]
+
+def test_cli_import_does_not_load_heavy_sdks():
+    """Test that importing the CLI leaves the Google SDKs and NumPy unloaded."""
+    code = (
+        "import sys, speech2text.cli; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == ""
+
+def test_cli_help_startup_time():
+    """Benchmark `--help` and guard against startup-time regressions."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "speech2text", "--help"], capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+
+    assert best < MAX_HELP_SECONDS, f"'speech2text --help' took {best:.2f}s"
@@ -0,0 +1,45 @@
+import io
+import json
+from click.testing import CliRunner
+from speech2text import transcript_merge
+from speech2text.cli import cli
+
+def write_part(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def test_find_parts_sorts_naturally(tmp_path):
+    """Test that part numbers are ordered by value and the manifest is left out."""
+    for name in ["job_part_10.json", "job_part_9.json", "job_part_100.json", "post_process_manifest.json"]:
+        write_part(tmp_path / name, {})
+
+    assert [p.name for p in transcript_merge.find_parts(tmp_path)] == ["job_part_9.json", "job_part_10.json", "job_part_100.json"]
+
+def test_merge_parts_keeps_order_and_removes_boundary_repeats(tmp_path):
+    """Test that parts are written in order and words repeated across a boundary are dropped once."""
+    transcripts = ["uno dos tres cuatro", "Tres, cuatro cinco seis", "seis siete", "siete siete ocho"]
+    paths = []
+    for i, transcript in enumerate(transcripts):
+        paths.append(tmp_path / f"job_part_{i}.json")
+        write_part(paths[-1], {"transcript": transcript})
+    write_part(tmp_path / "job_part_4.json", {"status": "ERROR"})
+    paths.append(tmp_path / "job_part_4.json")
+
+    output = io.StringIO()
+    stats = transcript_merge.merge_parts(paths, output, workers=2, dedup_overlap=5)
+
+    # Single-word repeats ("seis", "siete") are kept; only the two-word repeat "Tres, cuatro" is removed.
+    assert output.getvalue() == "uno dos tres cuatro\ncinco seis\nseis siete\nsiete siete ocho"
+    assert stats == transcript_merge.MergeStats(parts=4, skipped=1, words_removed=2)
+
+def test_merge_command_writes_raw_text(tmp_path):
+    """Test that the merge command writes the transcripts in part order next to the job directory."""
+    job_dir = tmp_path / "mesa_1"
+    job_dir.mkdir()
+    for i in [2, 0, 11, 1]:
+        write_part(job_dir / f"mesa_1_part_{i}.json", {"transcript": f"parte {i}"})
+
+    result = CliRunner().invoke(cli, ["merge", str(job_dir)])
+
+    assert result.exit_code == 0
+    assert (tmp_path / "mesa_1_transcription_raw.txt").read_text(encoding="utf-8") == "parte 0\nparte 1\nparte 2\nparte 11"
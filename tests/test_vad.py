@@ -0,0 +1,68 @@
+import io
+import wave
+import numpy as np
+import pytest
+from speech2text import cli, vad
+
+SAMPLE_RATE = 16000
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(samples.astype(np.int16).tobytes())
+
+def make_speech_with_gaps(seconds, gaps):
+    """Generates a noisy signal with silent stretches at the given (start, end) seconds."""
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-8000, 8000, size=int(seconds * SAMPLE_RATE))
+    for start, end in gaps:
+        samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0
+    return samples
+
+def test_trim_silence_removes_long_pauses(tmp_path):
+    """Test that long pauses are shortened to the padding and the kept audio is copied unchanged."""
+    samples = make_speech_with_gaps(20, gaps=[(5.0, 8.0), (12.0, 16.0), (18.0, 18.5)])
+    path = tmp_path / "audio.wav"
+    write_wav(path, samples)
+
+    result = vad.trim_silence(str(path))
+
+    # 7s of long pauses minus 0.25s of padding on each side of each of them.
+    assert result.original_seconds == pytest.approx(20.0)
+    assert result.trimmed_seconds == pytest.approx(14.0, abs=0.1)
+    assert result.trimmed_ratio == pytest.approx(0.3, abs=0.01)
+    assert len(result.offset_map) == 3
+
+    with wave.open(io.BytesIO(result.wav_data), "rb") as w:
+        trimmed = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    assert len(trimmed) == int(round(result.trimmed_seconds * SAMPLE_RATE))
+    for trimmed_start, original_start, duration in result.offset_map:
+        a, b, n = (int(round(x * SAMPLE_RATE)) for x in (trimmed_start, original_start, duration))
+        assert np.array_equal(trimmed[a:a + n], samples[b:b + n])
+
+def test_to_original_time():
+    """Test that times in the trimmed audio map back to the original timeline."""
+    offset_map = [[0.0, 0.0, 5.25], [5.25, 7.75, 4.5], [9.75, 15.75, 4.25]]
+
+    assert vad.to_original_time(1.0, offset_map) == pytest.approx(1.0)
+    assert vad.to_original_time(6.0, offset_map) == pytest.approx(8.5)
+    assert vad.to_original_time(10.0, offset_map) == pytest.approx(16.0)
+    assert vad.to_original_time(3.0, []) == 3.0
+
+def test_upload_of_all_silent_audio_sends_the_original(mocker, tmp_path):
+    """Test that an all-silent file is uploaded untrimmed instead of as a header-only WAV."""
+    path = tmp_path / "silence.wav"
+    write_wav(path, np.zeros(SAMPLE_RATE * 10))
+    mocker.patch('speech2text.cli.GCS_BUCKET_NAME', 'bucket')
+    upload_file = mocker.patch('speech2text.cli.speech_service.upload_to_gcs', return_value="gs://bucket/silence.wav")
+    upload_bytes = mocker.patch('speech2text.cli.speech_service.upload_bytes_to_gcs')
+
+    gcs_uri, config, details = cli._upload_audio(path, flac=False, trim_silence=True)
+
+    assert vad.trim_silence(str(path)).trimmed_seconds == 0
+    assert gcs_uri == "gs://bucket/silence.wav"
+    assert details == {}
+    upload_file.assert_called_once_with(local_file_path=str(path), bucket_name="bucket", destination_blob_name="silence.wav")
+    upload_bytes.assert_not_called()
@@ -0,0 +1,56 @@
+from datetime import timedelta
+from types import SimpleNamespace
+import numpy as np
+from speech2text import word_timings
+
+def make_word(word, start, end, confidence=0.9, speaker_tag=0):
+    return SimpleNamespace(word=word, start_time=timedelta(seconds=start), end_time=timedelta(seconds=end), confidence=confidence, speaker_tag=speaker_tag)
+
+def make_result(*words_per_result):
+    return SimpleNamespace(results=[SimpleNamespace(alternatives=[SimpleNamespace(words=words)]) for words in words_per_result])
+
+def test_save_and_load_memory_mapped(tmp_path):
+    """Test that words round-trip through the store and the columns are memory-mapped on load."""
+    result = make_result(
+        [make_word("hola", 0.0, 0.4), make_word("a", 0.4, 0.5, 0.5)],
+        [make_word("todos", 1.2, 1.8), make_word("hola", 2.0, 2.3)],
+    )
+    timings = word_timings.from_result(result)
+    path = word_timings.timings_path(tmp_path / "job_part_000.json")
+    word_timings.save(timings, path)
+
+    loaded = word_timings.load(path)
+
+    assert path.name == "job_part_000.words"
+    assert isinstance(loaded.start_ms, np.memmap)
+    assert loaded.words() == ["hola", "a", "todos", "hola"]
+    assert loaded.vocabulary == ["hola", "a", "todos"]
+    assert loaded.start_ms.tolist() == [0, 400, 1200, 2000]
+    assert loaded.end_ms.tolist() == [400, 500, 1800, 2300]
+    assert loaded.words(*loaded.between(1.0, 2.0).indices(loaded.num_words)[:2]) == ["todos"]
+    assert loaded.index_at(1.5) == 2
+    assert loaded.index_at(-1) == -1
+    assert np.flatnonzero(loaded.confidence < 0.6).tolist() == [1]
+
+def test_diarized_result_uses_only_last_result():
+    """Test that with speaker tags only the final result, which repeats every word, is used."""
+    result = make_result(
+        [make_word("hola", 0.0, 0.4)],
+        [make_word("hola", 0.0, 0.4, speaker_tag=1), make_word("qué", 0.5, 0.7, speaker_tag=2)],
+    )
+
+    timings = word_timings.from_result(result)
+
+    assert timings.words() == ["hola", "qué"]
+    assert timings.speaker.tolist() == [1, 2]
+
+def test_to_original_timeline_applies_offset_map():
+    """Test that times on trimmed audio are shifted back by the silence removed before them."""
+    timings = word_timings.from_result(make_result([make_word("uno", 0.5, 1.0), make_word("dos", 2.5, 3.0)]))
+    # Trimmed [0, 2) comes from original [0, 2); trimmed [2, ...) from original [5, ...).
+    offset_map = [[0.0, 0.0, 2.0], [2.0, 5.0, 4.0]]
+
+    remapped = word_timings.to_original_timeline(timings, offset_map)
+
+    assert remapped.start_ms.tolist() == [500, 5500]
+    assert remapped.end_ms.tolist() == [1000, 6000]